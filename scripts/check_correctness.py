@@ -6,28 +6,58 @@
 #   python3 scripts/check_correctness.py    # run across all test cases
 
 import os
+import re
 import sys
 import subprocess
 import tempfile
-from typing import Dict, Set, Tuple, List
+from functools import lru_cache
+from typing import Dict, Optional, Set, Tuple, List
 
 # Make sure the project root is on sys.path so we can import from src when run directly
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 from src.diff.preprocessing import preprocess_file
 
+# Hunk header: @@ -old_start[,old_count] +new_start[,new_count] @@
+HUNK_RE = re.compile(r'^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@', re.MULTILINE)
+
+# One "old-new" pair per line in a map file
+MAP_PAIR_RE = re.compile(rb'(\d+)-(\d+)')
+
+# Test case files: test_case_N_old.ext, test_case_N_new.ext, test_case_N_map.txt
+CASE_FILE_RE = re.compile(r'^test_case_(\d+)_(?:(old|new)\.|map\.txt$)')
+
+
+def find_test_cases(test_dir: str) -> Dict[int, Dict[str, str]]:
+    """
+    Index every test case file in a single directory listing
+    
+    Returns {case_num: {"old": path, "new": path, "map": path}}, with only the
+    keys whose files exist
+    """
+    cases = {}
+    for name in os.listdir(test_dir):
+        match = CASE_FILE_RE.match(name)
+        if match:
+            kind = match.group(2) or "map"
+            cases.setdefault(int(match.group(1)), {})[kind] = os.path.join(test_dir, name)
+    return cases
+
 
 def load_mapping_file(path: str) -> Set[Tuple[int, int]]:
     """Load mapping file and return set of (old_line, new_line) pairs (1-based)"""
-    pairs = set()
-    with open(path, encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            left, right = line.split("-")
-            pairs.add((int(left), int(right)))
-    return pairs
+    # Callers get their own mutable copy of the cached set
+    return set(_cached_mapping_file(path, os.stat(path).st_mtime_ns))
+
+
+@lru_cache(maxsize=None)
+def _cached_mapping_file(path: str, mtime_ns: int) -> frozenset:
+    """Parse a map file in one read; the mtime is only part of the cache key"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return frozenset((int(left), int(right)) for left, right in MAP_PAIR_RE.findall(data))
 
 
 def parse_git_diff_unified(diff_output: str) -> Set[Tuple[int, int]]:
@@ -40,65 +70,40 @@ def parse_git_diff_unified(diff_output: str) -> Set[Tuple[int, int]]:
     Returns set of (old_line, new_line) tuples (1-based)
     """
     mappings = set()
-    lines = diff_output.split('\n')
     
-    i = 0
-    while i < len(lines):
-        line = lines[i]
+    # Unified diff hunks start with '@@', so jump straight from one header to the next
+    headers = list(HUNK_RE.finditer(diff_output))
+    for h, match in enumerate(headers):
+        # Track where we are in the old and new files as we walk the hunk
+        old_line = int(match.group(1))
+        new_line = int(match.group(3))
         
-        # Unified diff hunks start with '@@', anything else can be skipped
-        if line.startswith('@@'):
-            # Parse hunk header
-            # Format: @@ -old_start,old_count +new_start,new_count @@
-            try:
-                # Extract the numbers from @@ -a,b +c,d @@
-                # Pull out the start line and optional line counts for old and new files
-                import re
-                match = re.search(r'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@', line)
-                if match:
-                    old_start = int(match.group(1))
-                    old_count = int(match.group(2)) if match.group(2) else 0
-                    new_start = int(match.group(3))
-                    new_count = int(match.group(4)) if match.group(4) else 0
-                    
-                    # Track where we are in the old and new files as we walk the hunk
-                    old_line = old_start
-                    new_line = new_start
-                    i += 1
-                    
-                    while i < len(lines):
-                        hunk_line = lines[i]
-                        
-                        # If we hit the beginning of another hunk or a new diff header, this hunk is done
-                        if hunk_line.startswith('@@') or hunk_line.startswith('diff --git') or hunk_line.startswith('---') or hunk_line.startswith('+++'):
-                            break
-                        
-                        if hunk_line.startswith(' '):
-                            # It exists in both versions at these lines numbers    
-                                # Maps old_line to new_line
-                            mappings.add((old_line, new_line))
-                            old_line += 1
-                            new_line += 1
-                        elif hunk_line.startswith('-'):
-                            # Deleted line
-                                # Only in old, no mapping
-                            old_line += 1
-                        elif hunk_line.startswith('+'):
-                            # Added line 
-                                # Only in new, no mapping
-                            new_line += 1
-                        elif hunk_line.startswith('\\'):
-                            # End of file marker
-                            pass
-                        
-                        i += 1
-                    continue
-            except Exception:
-                # If parsing one hunk fails, just move on
-                # We will return whatever mappings have been collected
-                pass
+        # The hunk body runs from the line after the header up to the next header
+        body_start = diff_output.find('\n', match.end()) + 1
+        body_end = headers[h + 1].start() if h + 1 < len(headers) else len(diff_output)
+        if body_start == 0:
+            continue
         
-        i += 1
+        for hunk_line in diff_output[body_start:body_end].split('\n'):
+            # If we hit a new diff header, this hunk is done
+            if hunk_line.startswith(('diff --git', '---', '+++')):
+                break
+            
+            if hunk_line.startswith(' '):
+                # It exists in both versions at these lines numbers    
+                    # Maps old_line to new_line
+                mappings.add((old_line, new_line))
+                old_line += 1
+                new_line += 1
+            elif hunk_line.startswith('-'):
+                # Deleted line
+                    # Only in old, no mapping
+                old_line += 1
+            elif hunk_line.startswith('+'):
+                # Added line 
+                    # Only in new, no mapping
+                new_line += 1
+            # '\' lines are "No newline at end of file" markers, nothing to map
     
     return mappings
 
@@ -106,15 +111,27 @@ def parse_git_diff_unified(diff_output: str) -> Set[Tuple[int, int]]:
 def get_git_diff_mappings(old_file_path: str, new_file_path: str) -> Set[Tuple[int, int]]:
     """
     Use git diff or standard diff to get line mappings between two files
-    Tries git diff first, falls back to standard diff command
+    Tries standard diff first, falls back to git diff
+    
+    Results are cached per (path, mtime) pair, so re-checking unchanged files spawns no processes
     """
+    mappings = _cached_git_diff_mappings(old_file_path, new_file_path,
+                                         os.stat(old_file_path).st_mtime_ns,
+                                         os.stat(new_file_path).st_mtime_ns)
+    # Callers get their own mutable copy of the cached set
+    return set(mappings)
+
+
+@lru_cache(maxsize=None)
+def _cached_git_diff_mappings(old_file_path: str, new_file_path: str,
+                              old_mtime_ns: int, new_mtime_ns: int) -> frozenset:
+    """Diff the two files; the mtimes are only part of the cache key"""
     # Try standard diff command first (Simpler, more reliable)
     result = subprocess.run(['diff', '-u', old_file_path, new_file_path], capture_output=True, text=True, check=False)
     
-    if result.stdout:
-        mappings = parse_git_diff_unified(result.stdout)
-        if mappings:
-            return mappings
+    # Exit status 1 just means the files differ; the unified diff is all we need
+    if result.returncode in (0, 1) and result.stdout:
+        return frozenset(parse_git_diff_unified(result.stdout))
     
     # Fallback: try git diff in temporary repository
     try:
@@ -142,11 +159,11 @@ def get_git_diff_mappings(old_file_path: str, new_file_path: str) -> Set[Tuple[i
             result = subprocess.run(['git', 'diff', '--cached', '--unified=0', 'old_file'], cwd=tmpdir, capture_output=True, text=True, check=False)
             
             if result.stdout:
-                return parse_git_diff_unified(result.stdout)
+                return frozenset(parse_git_diff_unified(result.stdout))
     except Exception:
         pass
     
-    return set()
+    return frozenset()
 
 
 def compare_mappings(our_mappings: Set[Tuple[int, int]], 
@@ -187,20 +204,17 @@ def compare_mappings(our_mappings: Set[Tuple[int, int]],
     }
 
 
-def check_test_case(case_num: int, test_dir: str) -> Dict:
-    """Check correctness of a single test case."""
+def check_test_case(case_num: int, test_dir: str,
+                    case_files: Optional[Dict[str, str]] = None) -> Dict:
+    """Check correctness of a single test case (case_files: its entry from find_test_cases, if already known)"""
     # Find files
-    old_path = None
-    new_path = None
-    map_path = os.path.join(test_dir, f"test_case_{case_num}_map.txt")
+    if case_files is None:
+        case_files = find_test_cases(test_dir).get(case_num, {})
+    old_path = case_files.get("old")
+    new_path = case_files.get("new")
+    map_path = case_files.get("map")
     
-    for name in os.listdir(test_dir):
-        if name.startswith(f"test_case_{case_num}_old."):
-            old_path = os.path.join(test_dir, name)
-        elif name.startswith(f"test_case_{case_num}_new."):
-            new_path = os.path.join(test_dir, name)
-    
-    if not (old_path and new_path and os.path.exists(map_path)):
+    if not (old_path and new_path and map_path):
         return {"error": f"Missing files for test_case_{case_num}"}
     
     # Load our mappings
@@ -221,19 +235,13 @@ def check_test_case(case_num: int, test_dir: str) -> Dict:
 
 def check_all(test_dir: str):
     """Check all test cases"""
-    case_ids = []
-    for name in os.listdir(test_dir):
-        if name.startswith("test_case_") and "_old." in name:
-            middle = name[len("test_case_"):]
-            num_str = middle.split("_")[0]
-            if num_str.isdigit():
-                case_ids.append(int(num_str))
-    
-    case_ids = sorted(set(case_ids))
+    # One directory listing serves both case discovery and path lookup
+    cases = find_test_cases(test_dir)
+    case_ids = sorted(case_num for case_num, files in cases.items() if "old" in files)
     
     results = []
     for case_id in case_ids:
-        result = check_test_case(case_id, test_dir)
+        result = check_test_case(case_id, test_dir, cases[case_id])
         if "error" not in result:
             results.append(result)
             print(f"test_case_{case_id}: "
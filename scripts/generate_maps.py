@@ -10,37 +10,49 @@
 #   'x+'  -> insertion (ignore for mapping)
 
 import os
+import re
 import ast
+import json
+from functools import lru_cache
 
 OUTPUT_FILE = "output.txt"
 TEST_DIR = "tests"
 
 
+# A diff token: line number, op, optional second line number
+TOKEN_RE = re.compile(r"(\d+)([:~+-])(\d*)")
+
+
+@lru_cache(maxsize=1 << 16)
 def parse_token(token: str):
     """
     Convert a token like '3:5' or '3~5' into a (3, 5) mapping.
     Ignore deletions ('3-') and insertions ('3+').
     Return None for non-mapping tokens.
     """
-    token = token.strip().strip("'").strip('"')
+    # Whitespace and both quote styles come off in a single strip
+    match = TOKEN_RE.fullmatch(token.strip(" \t\n\r'\""))
+    if match is None:
+        return None
 
     # Deletion or insertion: 'x-' or 'x+'
-    if token.endswith("-") or token.endswith("+"):
+    left, op, right = match.groups()
+    if op in "+-" or not right:
         return None
 
-    if "~" in token:
-        left, right = token.split("~", 1)
-    elif ":" in token:
-        left, right = token.split(":", 1)
-    else:
-        return None
+    return (int(left), int(right))
 
+
+def _parse_token_list(list_str: str):
+    """
+    Parse a printed token list like "['1:1', '2~3', '4-']".
+    Diff tokens never contain quotes, so swapping to double quotes makes it valid JSON
+    and the C json parser handles it; anything else goes through ast.literal_eval.
+    """
     try:
-        i = int(left)
-        j = int(right)
-        return (i, j)
+        return json.loads(list_str.replace("'", '"'))
     except ValueError:
-        return None
+        return ast.literal_eval(list_str)
 
 
 def main():
@@ -48,33 +60,28 @@ def main():
         print(f"[ERROR] {OUTPUT_FILE} not found. Run run_tests.py first.")
         return 1
 
-    with open(OUTPUT_FILE, encoding="utf-8") as f:
-        lines = f.readlines()
-
-    i = 0
     case_num = 0
     created = 0
 
-    while i < len(lines):
-        line = lines[i].strip()
-        # Look for lines like "Test case 1: "
-        if line.startswith("Test case "):
+    # Stream the file: each "Test case N:" header is followed by its token list
+    with open(OUTPUT_FILE, encoding="utf-8") as f:
+        for line in f:
+            # Look for lines like "Test case 1: "
+            if not line.strip().startswith("Test case "):
+                continue
             case_num += 1
 
             # Next non-empty line should be the Python list of tokens
-            i += 1
-            while i < len(lines) and not lines[i].strip():
-                i += 1
-            if i >= len(lines):
+            list_line = next((nxt for nxt in f if nxt.strip()), None)
+            if list_line is None:
                 break
 
-            list_str = lines[i].strip()
+            list_str = list_line.strip()
 
             try:
-                tokens = ast.literal_eval(list_str)
+                tokens = _parse_token_list(list_str)
             except Exception as e:
                 print(f"[WARN] Could not parse token list for test case {case_num}: {e}")
-                i += 1
                 continue
 
             mappings = []
@@ -87,14 +94,12 @@ def main():
             # Write test_case_N_map.txt in tests/test_cases/
             map_path = os.path.join(TEST_DIR, "test_cases", f"test_case_{case_num}_map.txt")
             with open(map_path, "w", encoding="utf-8") as mf:
-                for (a, b) in mappings:
-                    mf.write(f"{a}-{b}\n")
+                # Whole file in one write
+                mf.write("".join(f"{a}-{b}\n" for (a, b) in mappings))
 
             print(f"[OK] Wrote {len(mappings)} mappings to {map_path}")
             created += 1
 
-        i += 1
-
     print(f"\nDone. Created {created} map files.")
     return 0
 
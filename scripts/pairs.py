@@ -4,6 +4,7 @@
 from pydriller import Repository # type: ignore
 import os
 from collections import defaultdict
+from pathlib import Path
 
 # MUST CHANGE PATH TO REPO WHEN RUNNING ON A DIFFERENT MACHINE
 REPO_PATH = "/Users/aleksavucak/Desktop/airflow"
@@ -42,16 +43,19 @@ DEFAULT_LIMIT = 0
 pair_id = 1
 ext_counts = defaultdict(int)
 
+
+def all_limits_reached():
+    """True once no extension can take another pair, so later commits can't add anything"""
+    # With a nonzero DEFAULT_LIMIT any new extension could still be collected
+    return DEFAULT_LIMIT == 0 and all(ext_counts[e] >= lim for e, lim in EXT_LIMITS.items())
+
+
 for commit in Repository(REPO_PATH).traverse_commits():
     for mod in commit.modified_files:
         # Only modified files, not added/deleted
         if mod.change_type.name != "MODIFY":
             continue
 
-        # Need both before and after contents
-        if mod.source_code_before is None or mod.source_code is None:
-            continue
-
         _, ext = os.path.splitext(mod.filename)
 
         # If this extension isn't in our limits and DEFAULT_LIMIT == 0: skip
@@ -63,6 +67,11 @@ for commit in Repository(REPO_PATH).traverse_commits():
         if ext_counts[ext] >= limit:
             continue
 
+        # Need both before and after contents
+        # (checked last: PyDriller fetches the blobs from git on first access)
+        if mod.source_code_before is None or mod.source_code is None:
+            continue
+
         old_code = mod.source_code_before
         new_code = mod.source_code
 
@@ -72,10 +81,9 @@ for commit in Repository(REPO_PATH).traverse_commits():
         old_path = os.path.join(OUTPUT_DIR, f"{case_prefix}_old{ext}")
         new_path = os.path.join(OUTPUT_DIR, f"{case_prefix}_new{ext}")
 
-        with open(old_path, "w", encoding="utf-8") as f:
-            f.write(old_code)
-        with open(new_path, "w", encoding="utf-8") as f:
-            f.write(new_code)
+        # Encode once and write the bytes in one go, skipping the text-mode layer
+        Path(old_path).write_bytes(old_code.encode("utf-8"))
+        Path(new_path).write_bytes(new_code.encode("utf-8"))
 
         ext_counts[ext] += 1
 
@@ -85,10 +93,11 @@ for commit in Repository(REPO_PATH).traverse_commits():
         )
         pair_id += 1
 
-        if pair_id > MAX_PAIRS:
+        if pair_id > MAX_PAIRS or all_limits_reached():
             break
 
-    if pair_id > MAX_PAIRS:
+    # Stop walking history once nothing more can be collected
+    if pair_id > MAX_PAIRS or all_limits_reached():
         break
 
 print("Done.")
@@ -10,14 +10,25 @@ from .diff import (
     match_lines, normalized_levenshtein, cosine_similarity
 )
 
-# Bug tracking functionality
-from .bug_tracking import (
-    BugDetector, parse_commit_messages,
-    extract_bug_signature, build_line_mapping,
-    BugBacktracker, backtrack_bug_to_origin,
-    CommitHistory, FileVersionLoader,
-    find_bug_in_version, track_line_backward
-)
+# Bug tracking functionality is imported on first access (PEP 562), so
+# `import src` for diffing doesn't load the whole bug_tracking package
+_LAZY_BUG_TRACKING = frozenset({
+    'BugDetector', 'parse_commit_messages',
+    'extract_bug_signature', 'build_line_mapping',
+    'BugBacktracker', 'backtrack_bug_to_origin',
+    'CommitHistory', 'FileVersionLoader',
+    'find_bug_in_version', 'track_line_backward',
+})
+
+
+def __getattr__(name):
+    if name in _LAZY_BUG_TRACKING:
+        from . import bug_tracking
+        value = getattr(bug_tracking, name)
+        # Cache on the package so later lookups skip __getattr__
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Models (shared data structures)
 from .models import (
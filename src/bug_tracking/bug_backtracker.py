@@ -2,7 +2,11 @@
 Traces bugs from fix commit back to the introducing commit
 """
 
-from typing import List, Dict, Optional
+import io
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from operator import attrgetter
+from typing import List, Dict, Optional, TextIO, Tuple
 from ..models import (
     CommitInfo, FileVersion, BugSignature, BugLineage, BugMatch,
     LineMapping, LineHistory,
@@ -10,7 +14,7 @@ from ..models import (
 )
 from .commit_history import CommitHistory
 from .file_version_loader import FileVersionLoader
-from .bug_signature import extract_bug_signature, compute_diff_and_mapping
+from .bug_signature import extract_bug_signature
 from .line_tracker import (
     find_bug_in_version, find_bug_introduction,
     track_line_backward, calculate_trace_confidence
@@ -28,64 +32,94 @@ class BugBacktracker:
         # Cache for loaded data
         self._commit_histories: Dict[str, CommitHistory] = {}
         self._version_loaders: Dict[str, FileVersionLoader] = {}
+        
+        # Cache for bug signatures: (file, fix version) -> signature
+        self._signature_cache: Dict[Tuple[str, int], BugSignature] = {}
     
     def _get_commit_history(self, file_name: str) -> CommitHistory:
         """Get or create CommitHistory for a file"""
-        if file_name not in self._commit_histories:
-            self._commit_histories[file_name] = CommitHistory(
-                self.desc_file, file_name
-            )
-        return self._commit_histories[file_name]
+        commit_history = self._commit_histories.get(file_name)
+        if commit_history is None:
+            commit_history = CommitHistory(self.desc_file, file_name)
+            self._commit_histories[file_name] = commit_history
+        return commit_history
     
     def _get_version_loader(self, file_name: str) -> FileVersionLoader:
         """Get or create FileVersionLoader for a file"""
-        if file_name not in self._version_loaders:
-            self._version_loaders[file_name] = FileVersionLoader(
-                self.files_directory, file_name
-            )
-        return self._version_loaders[file_name]
+        version_loader = self._version_loaders.get(file_name)
+        if version_loader is None:
+            # Every trace of a file searches its whole history, so keep all of
+            # its versions loaded rather than evicting them between traces
+            version_loader = FileVersionLoader(self.files_directory, file_name, cache_max=None)
+            self._version_loaders[file_name] = version_loader
+        return version_loader
+    
+    def _cached_signature(
+        self,
+        file_name: str,
+        bug_fix_version: int,
+        file_before_fix: FileVersion,
+        file_after_fix: FileVersion
+    ) -> BugSignature:
+        """Bug signature of the fix at bug_fix_version, extracted once per fix"""
+        key = (file_name, bug_fix_version)
+        signature = self._signature_cache.get(key)
+        if signature is None:
+            signature = extract_bug_signature(file_before_fix, file_after_fix)
+            self._signature_cache[key] = signature
+        return signature
     
     def analyze_file(self, file_name: str, verbose: bool = True) -> List[BugLineage]:
         """Analyze all bug fixes in a file's history"""
         commit_history = self._get_commit_history(file_name)
+        # One pass over the history serves both the empty check and the loop
+        bug_fix_commits = commit_history.get_bug_fix_commits()
         
-        if not commit_history.has_bug_fixes():
+        if not bug_fix_commits:
             if verbose:
                 print(f"\nNo bug fixes found in {file_name}")
             return []
         
         lineages = []
-        bug_fix_commits = commit_history.get_bug_fix_commits()
         
-        if verbose:
-            print(f"\n{'='*60}")
-            print(f"ANALYZING FILE: {file_name}")
-            print(f"Found {len(bug_fix_commits)} bug fix(es)")
-            print(f"{'='*60}")
-        
-        for i, fix_commit in enumerate(bug_fix_commits, 1):
+        # Collect the report for the whole file and write it to stdout in one
+        # go rather than one print per line (only built when verbose)
+        report = io.StringIO() if verbose else None
+        try:
             if verbose:
-                print(f"\n[Bug Fix {i}/{len(bug_fix_commits)}]")
+                print(f"\n{'='*60}", file=report)
+                print(f"ANALYZING FILE: {file_name}", file=report)
+                print(f"Found {len(bug_fix_commits)} bug fix(es)", file=report)
+                print(f"{'='*60}", file=report)
             
-            try:
-                lineage = self.trace_single_bug(file_name, fix_commit.version)
-                lineages.append(lineage)
-            except BugTraceError as e:
-                # Create a failed lineage entry
-                lineage = BugLineage(
-                    fix_commit=fix_commit,
-                    fix_version=fix_commit.version,
-                    signature=BugSignature([], [], [], [], [], "unknown", []),
-                    introduction_commit=None,
-                    introduction_version=-1,
-                    introduction_lines=[],
-                    confidence=0.0,
-                    trace_complete=False,
-                    error_message=str(e)
-                )
-                lineages.append(lineage)
+            for i, fix_commit in enumerate(bug_fix_commits, 1):
                 if verbose:
-                    print(f"\nWARNING: Trace failed: {e}\n")
+                    print(f"\n[Bug Fix {i}/{len(bug_fix_commits)}]", file=report)
+                
+                try:
+                    lineage = self.trace_single_bug(
+                        file_name, fix_commit.version, verbose=verbose, out=report
+                    )
+                    lineages.append(lineage)
+                except BugTraceError as e:
+                    # Create a failed lineage entry
+                    lineage = BugLineage(
+                        fix_commit=fix_commit,
+                        fix_version=fix_commit.version,
+                        signature=BugSignature([], [], [], [], [], "unknown", []),
+                        introduction_commit=None,
+                        introduction_version=-1,
+                        introduction_lines=[],
+                        confidence=0.0,
+                        trace_complete=False,
+                        error_message=str(e)
+                    )
+                    lineages.append(lineage)
+                    if verbose:
+                        print(f"\nWARNING: Trace failed: {e}\n", file=report)
+        finally:
+            if report is not None:
+                sys.stdout.write(report.getvalue())
         
         return lineages
     
@@ -93,9 +127,19 @@ class BugBacktracker:
         self,
         file_name: str,
         bug_fix_version: int,
-        similarity_threshold: float = 0.7
+        similarity_threshold: float = 0.7,
+        verbose: bool = True,
+        out: Optional[TextIO] = None
     ) -> BugLineage:
-        """Trace a specific bug fix back to its origin"""
+        """
+        Trace a specific bug fix back to its origin
+        
+        Verbose results are printed to out (stdout when None)
+        """
+        # A fix needs a version before it; don't touch the disk to find that out
+        if bug_fix_version <= 0:
+            raise TraceIncomplete(f"Cannot trace fix at version {bug_fix_version}: no earlier version exists")
+        
         commit_history = self._get_commit_history(file_name)
         version_loader = self._get_version_loader(file_name)
         
@@ -118,7 +162,7 @@ class BugBacktracker:
             raise TraceIncomplete(f"Cannot load required versions: {e}")
         
         # Extract bug signature from the fix diff
-        bug_signature = extract_bug_signature(file_before_fix, file_after_fix)
+        bug_signature = self._cached_signature(file_name, bug_fix_version, file_before_fix, file_after_fix)
         
         if bug_signature.is_empty():
             # No buggy lines identified, might be insertion-only fix
@@ -135,17 +179,15 @@ class BugBacktracker:
             )
         
         # Load all versions from 0 to before-fix for backward search
-        versions_to_search = []
-        for v in range(bug_fix_version - 1, -1, -1):  #newest to oldest
+        # (the before-fix version is already loaded, so start from the one before it)
+        versions_to_search = [file_before_fix]
+        for v in range(bug_fix_version - 2, -1, -1):  #newest to oldest
             try:
                 versions_to_search.append(version_loader.load_version(v))
             except FileVersionNotFound:
                 # Stop if we can't load earlier versions
                 break
         
-        if not versions_to_search:
-            raise TraceIncomplete("No versions available to search")
-        
         # Find where bug was introduced
         introduction_version, matches_by_version = find_bug_introduction(
             versions_to_search, bug_signature, similarity_threshold
@@ -167,7 +209,7 @@ class BugBacktracker:
         # Build versions_with_bug list
         versions_with_bug = sorted(
             matches_by_version.values(),
-            key=lambda m: m.version
+            key=attrgetter('version')
         )
         
         # Calculate confidence
@@ -195,71 +237,100 @@ class BugBacktracker:
         )
         
         # Print results for user visibility
-        self._print_trace_results(lineage)
+        if verbose:
+            self._print_trace_results(lineage, out)
         
         return lineage
     
-    def batch_analyze(self, file_names: List[str]) -> Dict[str, List[BugLineage]]:
-        """Analyze multiple files in batch"""
-        results = {}
-        for file_name in file_names:
-            try:
-                results[file_name] = self.analyze_file(file_name)
-            except Exception as e:
-                results[file_name] = []
-        return results
+    def batch_analyze(
+        self,
+        file_names: List[str],
+        max_workers: Optional[int] = 1,
+        verbose: bool = True
+    ) -> Dict[str, List[BugLineage]]:
+        """
+        Analyze multiple files in batch
+        
+        By default files are analyzed in this process, sharing its caches.
+        max_workers other than 1 analyzes them in a process pool instead (None
+        for one worker per CPU); workers start with empty caches, print as they
+        go (pass verbose=False to keep pooled runs quiet), and on spawn-start
+        platforms the caller needs an if __name__ == "__main__" guard
+        """
+        if len(file_names) < 2 or max_workers == 1:
+            return {file_name: self._analyze_file_safe(file_name, verbose) for file_name in file_names}
+        
+        # Workers build their own backtracker, so caches are per process
+        jobs = [(self.desc_file, self.files_directory, file_name, verbose) for file_name in file_names]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            return dict(zip(file_names, executor.map(_analyze_file_job, jobs)))
+    
+    def _analyze_file_safe(self, file_name: str, verbose: bool = True) -> List[BugLineage]:
+        """analyze_file for batch runs: a file that fails to analyze yields no lineages"""
+        try:
+            return self.analyze_file(file_name, verbose)
+        except Exception:
+            return []
     
     def get_file_summary(self, file_name: str) -> str:
         """Get a summary of commits and bug fixes for a file"""
         commit_history = self._get_commit_history(file_name)
         version_loader = self._get_version_loader(file_name)
         
-        lines = [
+        return "\n".join((
             f"File: {file_name}",
             f"Available versions: {version_loader.get_available_versions()}",
             "",
             commit_history.summary()
-        ]
-        
-        return "\n".join(lines)
+        ))
     
     def clear_cache(self) -> None:
         """Clear all cached data"""
+        self._signature_cache.clear()
         self._commit_histories.clear()
         for loader in self._version_loaders.values():
             loader.clear_cache()
         self._version_loaders.clear()
     
-    def _print_trace_results(self, lineage: BugLineage) -> None:
-        """Print trace results"""
-        print("\n" + "="*60)
-        print("BUG TRACE RESULTS")
-        print("="*60)
-        
-        #bug fix info
-        print(f"Bug Fix:")
-        print(f"   Version: v{lineage.fix_version}")
-        print(f"   Commit: {lineage.fix_commit.message}")
-        
-        # Bug introduction info
-        print(f"\nBug Introduction:")
+    def _print_trace_results(self, lineage: BugLineage, out: Optional[TextIO] = None) -> None:
+        """Print trace results (to stdout when out is None)"""
+        # Assemble the whole report and print it in one write
+        lines = [
+            "",
+            "="*60,
+            "BUG TRACE RESULTS",
+            "="*60,
+            #bug fix info
+            f"Bug Fix:",
+            f"   Version: v{lineage.fix_version}",
+            f"   Commit: {lineage.fix_commit.message}",
+            # Bug introduction info
+            f"\nBug Introduction:",
+        ]
         if lineage.introduction_version >= 0:
-            print(f"   Version: v{lineage.introduction_version}")
+            lines.append(f"   Version: v{lineage.introduction_version}")
             if lineage.introduction_commit:
-                print(f"   Commit: {lineage.introduction_commit.message}")
+                lines.append(f"   Commit: {lineage.introduction_commit.message}")
             else:
-                print(f"   Commit: (initial version)")
+                lines.append(f"   Commit: (initial version)")
             if lineage.introduction_lines:
-                print(f"   Lines: {lineage.introduction_lines}")
+                lines.append(f"   Lines: {lineage.introduction_lines}")
         else:
-            print(f"   Not found (confidence too low)")
+            lines.append(f"   Not found (confidence too low)")
         
         # Summary stats
-        print(f"\nSummary:")
-        print(f"   Commits Between: {lineage.commits_between}")
-        print(f"   Trace Complete: {'Yes' if lineage.trace_complete else 'No'}")
+        lines.append(f"\nSummary:")
+        lines.append(f"   Commits Between: {lineage.commits_between}")
+        lines.append(f"   Trace Complete: {'Yes' if lineage.trace_complete else 'No'}")
         
-        print("="*60 + "\n")
+        lines.append("="*60 + "\n")
+        print("\n".join(lines), file=out)
+
+
+def _analyze_file_job(job) -> List[BugLineage]:
+    """Process pool worker for batch_analyze: job is (desc_file, files_directory, file_name, verbose)"""
+    desc_file, files_directory, file_name, verbose = job
+    return BugBacktracker(desc_file, files_directory)._analyze_file_safe(file_name, verbose)
 
 
 def backtrack_bug_to_origin(
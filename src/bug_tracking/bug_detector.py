@@ -1,5 +1,30 @@
 import re
 
+# Issue references
+_ISSUE_PATTERN = r"#\d+"
+_CLOSES_PATTERN = r"(?:closes|fixes|resolves|fixed|resolved)\s+#?\d+"
+
+
+def _add_commit_entry(commits, entry_lines, target_file_name=None):
+    """Parse one '<file_name>: <message>' entry and add it to commits"""
+    entry = "".join(entry_lines).strip()
+    if not entry or ':' not in entry:
+        return
+    # Split only on the first colon to separate file name from message text
+    parts = entry.split(':', 1)
+    if len(parts) != 2:
+        return
+    file_name = parts[0].strip()
+    # Only the requested file's messages need to be kept
+    if target_file_name and file_name != target_file_name:
+        return
+    message = parts[1].strip()
+    # Accumulate all messages belonging to the same file
+    if file_name not in commits:
+        commits[file_name] = []
+    commits[file_name].append(message)
+
+
 # Utilities to parse commit messages from a text file and detect which messages are likely bug fixes based on 
 # keywords, prefixes, and issue references
 def parse_commit_messages(file_path, target_file_name=None):
@@ -12,77 +37,115 @@ def parse_commit_messages(file_path, target_file_name=None):
     followed by the commit message body.
     """
     commits = {}
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
     
-    # Split commits on double newlines so each block represents 1 entry
-    entries = content.split('\n\n')
-    for entry in entries:
-        entry = entry.strip()
-        if not entry or ':' not in entry:
-            continue
-        # Split only on the first colon to separate file name from message text
-        parts = entry.split(':', 1)
-        if len(parts) != 2:
-            continue
-        file_name = parts[0].strip()
-        message = parts[1].strip()
-        # Accumulate all messages belonging to the same file
-        if file_name not in commits:
-            commits[file_name] = []
-        commits[file_name].append(message)
+    # Stream the file; an empty line ends the current entry (the '\n\n' separator),
+    # so only one entry is held in memory at a time
+    current = []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line == '\n':
+                _add_commit_entry(commits, current, target_file_name)
+                current = []
+            else:
+                current.append(line)
+    _add_commit_entry(commits, current, target_file_name)
     
     # Optionally returns only the messages for a single file
     if target_file_name:
         return commits.get(target_file_name, [])
     return commits
 
+# Keywords commonly found in bug fix commits
+FIX_KEYWORDS = (
+    "fix", "bug", "error", "issue", "patch", "resolve",
+    "crash", "fatal", "critical", "urgent", "security", "vulnerability",
+    "hotfix", "bugfix", "defect", "fault", "broken", "broke", "fail", "failure",
+    "regression", "revert", "corrupt", "incorrect", "wrong",
+    "prevent", "avoid", "stop", "block",
+    "leak", "overflow", "underflow",
+    "hang", "freeze",
+    "undefined",
+    "exception",
+    "typo", "spelling",
+    "repair", "correct", "amend", "rectify"
+)
+
+# Conventional commit prefixes for bug fixes
+CONVENTIONAL_PREFIXES = (
+    "fix:", "fix(", "hotfix:", "hotfix(", 
+    "bugfix:", "bugfix(", "perf:", "perf(",
+    "revert:", "revert(", "security:", "security("
+)
+
+# Conventional commit types that are never bug fixes; these messages are
+# rejected from their first few characters without scanning the rest
+REJECT_PREFIXES = (
+    "feat:", "feat(", "docs:", "docs(", "test:", "test(",
+    "refactor:", "refactor(", "chore:", "chore(", "style:", "style(",
+    "build:", "build(", "ci:", "ci("
+)
+
+def _build_indicator_re(fix_keywords):
+    """
+    One pattern for the keywords (matched at the start of a word, so
+    "fixed"/"crashes" count but "prefix"/"debug" don't) and the issue
+    references, so a message is scanned once
+    """
+    patterns = [_ISSUE_PATTERN, _CLOSES_PATTERN]
+    if fix_keywords:
+        # An empty group would match every message
+        patterns.insert(0, r"(?<![a-z0-9])(?:" + "|".join(map(re.escape, fix_keywords)) + ")")
+    return re.compile("|".join(patterns))
+
+
+# Built once for the default keywords and shared by every default detector
+_INDICATOR_RE = _build_indicator_re(FIX_KEYWORDS)
+
+
 class BugDetector:
-    def __init__(self):
-        # Keywords commonly found in bug fix commits
-        self.fix_keywords = [
-            "fix", "bug", "error", "issue", "patch", "resolve",
-            "crash", "fatal", "critical", "urgent", "security", "vulnerability",
-            "hotfix", "bugfix", "defect", "fault", "broken", "broke", "fail", "failure",
-            "regression", "revert", "corrupt", "incorrect", "wrong",
-            "prevent", "avoid", "stop", "block",
-            "leak", "overflow", "underflow",
-            "hang", "freeze",
-            "undefined",
-            "exception",
-            "typo", "spelling",
-            "repair", "correct", "amend", "rectify"
-        ]
-        
-        # Conventional commit prefixes for bug fixes
-        self.conventional_prefixes = [
-            "fix:", "fix(", "hotfix:", "hotfix(", 
-            "bugfix:", "bugfix(", "perf:", "perf(",
-            "revert:", "revert(", "security:", "security("
-        ]
+    def __init__(self, fix_keywords=None, conventional_prefixes=None):
+        """
+        fix_keywords and conventional_prefixes replace FIX_KEYWORDS and
+        CONVENTIONAL_PREFIXES; they are compiled here, so changing the
+        attributes afterwards has no effect
+        """
+        self.fix_keywords = list(FIX_KEYWORDS if fix_keywords is None else fix_keywords)
+        self.conventional_prefixes = list(
+            CONVENTIONAL_PREFIXES if conventional_prefixes is None else conventional_prefixes
+        )
+        if fix_keywords is None:
+            self._indicator_re = _INDICATOR_RE
+        else:
+            # Keywords are matched against the lowercased message
+            self._indicator_re = _build_indicator_re([k.lower() for k in self.fix_keywords])
+        # str.startswith takes a tuple and checks every prefix in one call
+        self._prefix_tuple = tuple(p.lower() for p in self.conventional_prefixes)
+        # A type configured as a fix prefix is no longer rejected up front
+        self._reject_prefixes = tuple(p for p in REJECT_PREFIXES if p not in self._prefix_tuple)
+    
     def is_bug_fix(self, message):
+        # Non-fix conventional commit types only need their type prefix lowercased
+        if message[:10].lower().startswith(self._reject_prefixes):
+            return False
+        
         # Lowercase for case-insensitive matching
         text = message.lower()
         
         # Check conventional commit prefix
-        for prefix in self.conventional_prefixes:
-            if text.startswith(prefix):
-                return True
-        
-        # Check for bug-related keywords
-        for word in self.fix_keywords:
-            if word in text:
-                return True
-        # Check for issue numbers
-        if re.search(r"#\d+", text):
+        if text.startswith(self._prefix_tuple):
             return True
-        # Check for action words with issue numbers
-        if re.search(r"(closes|fixes|resolves|fixed|resolved)\s+#?\d+", text):
+        
+        # Check for bug-related keywords, issue numbers, and action words with issue numbers
+        if self._indicator_re.search(text):
             return True
         # No bug indicators found
         return False
 
 
+# Shared detector for callers that don't need their own instance (it holds no per-call state)
+DEFAULT_DETECTOR = BugDetector()
+
+
 if __name__ == "__main__":
     # Simple self-test demonstrating how the BugDetector class behaves
     detector = BugDetector()
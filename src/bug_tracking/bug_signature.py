@@ -2,10 +2,27 @@
 Extracts bug signatures from bug fix diffs used to search backward through history
 """
 
-from typing import List, Tuple, Optional
+from typing import Iterable, Iterator, List, Tuple, Optional
 from ..models import FileVersion, BugSignature, LineMapping
 from ..diff.preprocessing import preprocess_lines
-from ..diff.diff_hybrid import get_diff_hybrid
+from ..diff.diff import MATCH, DELETE, INSERT
+from ..diff.diff_hybrid import get_diff_hybrid_raw, format_diff_ops, SIMILAR
+
+# Kinds of change seen in a fix diff, combined as bit flags
+_DELETION_FLAG = 1
+_MODIFICATION_FLAG = 2
+_INSERTION_FLAG = 4
+
+# Fix type for every flag combination: any modification wins, then
+# deletion + insertion is "complex", then whichever kind occurred alone
+_FIX_TYPE_BY_FLAGS = tuple(
+    "modification" if flags & _MODIFICATION_FLAG
+    else "complex" if flags & _DELETION_FLAG and flags & _INSERTION_FLAG
+    else "deletion" if flags & _DELETION_FLAG
+    else "insertion_fix" if flags & _INSERTION_FLAG
+    else "unknown"
+    for flags in range(8)
+)
 
 
 def extract_bug_signature(
@@ -14,54 +31,41 @@ def extract_bug_signature(
     context_window: int = 3
 ) -> BugSignature:
     """Analyze the bug fix diff to identify what was buggy"""
-    # Convert to format expected by diff algorithm
-    old_for_diff = [[line] for line in file_before_fix.preprocessed]
-    new_for_diff = [[line] for line in file_after_fix.preprocessed]
-    
-    # Get hybrid diff
-    diff_ops = get_diff_hybrid(old_for_diff, new_for_diff)
+    # Get hybrid diff as structured ops, so no op string has to be parsed back
+    raw_ops = get_diff_hybrid_raw(file_before_fix.preprocessed, file_after_fix.preprocessed)
+    diff_ops = format_diff_ops(raw_ops)
     
     # Parse diff to identify buggy lines
     buggy_line_numbers = []
-    fix_type_counts = {"deletion": 0, "modification": 0, "insertion": 0}
+    # Only which kinds of change occur matters, not how many
+    fix_flags = 0
     
-    for op in diff_ops:
-        if op.endswith('-'):
+    for kind, old_num, _ in raw_ops:
+        if kind == DELETE:
             # Deletion: line was removed (Buggy)
                 # Note: diff ops use 1-based indexing, convert to 0-based for array access
-            line_num_1based = int(op[:-1])
-            buggy_line_numbers.append(line_num_1based - 1)
-            fix_type_counts["deletion"] += 1
-        elif '~' in op:
+            buggy_line_numbers.append(old_num - 1)
+            fix_flags |= _DELETION_FLAG
+        elif kind == INSERT:
+            # Insertion: new line added
+            fix_flags |= _INSERTION_FLAG
+        elif kind == SIMILAR:
             # Modification: line was changed (Buggy)
             # Note: diff ops use 1-based indexing, convert to 0-based for array access
-            old_num, new_num = op.split('~')
-            buggy_line_numbers.append(int(old_num) - 1)
-            fix_type_counts["modification"] += 1
-        elif op.endswith('+'):
-            # Insertion: new line added
-            fix_type_counts["insertion"] += 1
+            buggy_line_numbers.append(old_num - 1)
+            fix_flags |= _MODIFICATION_FLAG
     
     # Determine fix type
-    if fix_type_counts["modification"] > 0:
-        fix_type = "modification"
-    elif fix_type_counts["deletion"] > 0 and fix_type_counts["insertion"] > 0:
-        fix_type = "complex"
-    elif fix_type_counts["deletion"] > 0:
-        fix_type = "deletion"
-    elif fix_type_counts["insertion"] > 0:
-        fix_type = "insertion_fix"
-    else:
-        fix_type = "unknown"
+    fix_type = _FIX_TYPE_BY_FLAGS[fix_flags]
     
     # Extract buggy lines from before-fix file
-    buggy_lines = []
-    buggy_lines_normalized = []
+    before_lines = file_before_fix.lines
+    before_preprocessed = file_before_fix.preprocessed
+    num_lines = len(before_lines)
     
-    for line_num in buggy_line_numbers:
-        if 0 <= line_num < len(file_before_fix.lines):
-            buggy_lines.append(file_before_fix.lines[line_num])
-            buggy_lines_normalized.append(file_before_fix.preprocessed[line_num])
+    valid_line_numbers = [line_num for line_num in buggy_line_numbers if 0 <= line_num < num_lines]
+    buggy_lines = [before_lines[line_num] for line_num in valid_line_numbers]
+    buggy_lines_normalized = [before_preprocessed[line_num] for line_num in valid_line_numbers]
     
     # Extract context
     context_before = []
@@ -71,17 +75,13 @@ def extract_bug_signature(
         min_line = min(buggy_line_numbers)
         max_line = max(buggy_line_numbers)
         
-        # Context before
+        # Context before (slice bounds are already clamped to the file)
         start = max(0, min_line - context_window)
-        for i in range(start, min_line):
-            if i < len(file_before_fix.lines):
-                context_before.append(file_before_fix.lines[i])
+        context_before = before_lines[start:min_line]
         
         # Context after
-        end = min(len(file_before_fix.lines), max_line + context_window + 1)
-        for i in range(max_line + 1, end):
-            if i < len(file_before_fix.lines):
-                context_after.append(file_before_fix.lines[i])
+        end = min(num_lines, max_line + context_window + 1)
+        context_after = before_lines[max_line + 1:end]
     
     return BugSignature(
         buggy_lines=buggy_lines,
@@ -94,51 +94,69 @@ def extract_bug_signature(
     )
 
 
-def build_line_mapping(
-    diff_operations: List[str],
+def _line_mapping_from_ops(
+    raw_ops: Iterable[Tuple[str, Optional[int], Optional[int]]],
     old_version: int,
     new_version: int
 ) -> LineMapping:
-    """ Parse diff operations to create line number mapping"""
+    """Line number mapping from structured (kind, old, new) diff ops"""
     mapping = LineMapping(
         old_version=old_version,
         new_version=new_version
     )
     
-    for op in diff_operations:
-        if ':' in op and '~' not in op:
-            # Exact match: "x:y"
-            old_num, new_num = map(int, op.split(':'))
-            mapping.exact_matches[new_num] = old_num
-        elif '~' in op:
-            # Similarity match: "x~y"
-            old_num, new_num = map(int, op.split('~'))
-            mapping.similarity_matches[new_num] = old_num
-        elif op.endswith('-'):
-            # Deletion: "x-"
-            old_num = int(op[:-1])
+    exact_matches = mapping.exact_matches
+    similarity_matches = mapping.similarity_matches
+    for kind, old_num, new_num in raw_ops:
+        if kind == MATCH:
+            exact_matches[new_num] = old_num
+        elif kind == SIMILAR:
+            similarity_matches[new_num] = old_num
+        elif kind == DELETE:
             mapping.deletions.add(old_num)
-        elif op.endswith('+'):
-            # Insertion: "x+"
-            new_num = int(op[:-1])
+        else:
             mapping.insertions.add(new_num)
     
     return mapping
 
 
+def _parse_diff_ops(diff_operations: List[str]) -> Iterator[Tuple[str, Optional[int], Optional[int]]]:
+    """Turn formatted diff ops back into the (kind, old, new) tuples format_diff_ops takes"""
+    for op in diff_operations:
+        # The last character alone tells the op kind apart ('-', '+', or a digit)
+        kind = op[-1]
+        if kind == '-':
+            # Deletion: "x-"
+            yield DELETE, int(op[:-1]), None
+        elif kind == '+':
+            # Insertion: "x+"
+            yield INSERT, None, int(op[:-1])
+        elif ':' in op:
+            # Exact match: "x:y"
+            old_num, _, new_num = op.partition(':')
+            yield MATCH, int(old_num), int(new_num)
+        else:
+            # Similarity match: "x~y"
+            old_num, _, new_num = op.partition('~')
+            yield SIMILAR, int(old_num), int(new_num)
+
+
+def build_line_mapping(
+    diff_operations: List[str],
+    old_version: int,
+    new_version: int
+) -> LineMapping:
+    """ Parse diff operations to create line number mapping"""
+    return _line_mapping_from_ops(_parse_diff_ops(diff_operations), old_version, new_version)
+
+
 def compute_diff_and_mapping(
     file_old: FileVersion,
     file_new: FileVersion
 ) -> Tuple[List[str], LineMapping]:
     """Compute diff between two versions and build line mapping"""
-    # Convert to format expected by diff algorithm
-    old_for_diff = [[line] for line in file_old.preprocessed]
-    new_for_diff = [[line] for line in file_new.preprocessed]
-    
-    # Get hybrid diff
-    diff_ops = get_diff_hybrid(old_for_diff, new_for_diff)
-    
-    # Build line mapping
-    mapping = build_line_mapping(diff_ops, file_old.version, file_new.version)
+    # Get hybrid diff as structured ops and build the mapping straight from them
+    raw_ops = get_diff_hybrid_raw(file_old.preprocessed, file_new.preprocessed)
+    mapping = _line_mapping_from_ops(raw_ops, file_old.version, file_new.version)
     
-    return diff_ops, mapping
\ No newline at end of file
+    return format_diff_ops(raw_ops), mapping
\ No newline at end of file
@@ -3,9 +3,9 @@ Manages commit history from desc.txt files
 Parses commits and identifies bug fixes
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from ..models import CommitInfo, FileVersionNotFound, NoBugFixFound, InvalidDataFormat
-from .bug_detector import BugDetector, parse_commit_messages
+from .bug_detector import DEFAULT_DETECTOR, parse_commit_messages
 
 
 class CommitHistory:
@@ -15,11 +15,20 @@ class CommitHistory:
         """Initialize with desc.txt path and target file name"""
         self.desc_file_path = desc_file_path
         self.file_name = file_name
-        self.bug_detector = BugDetector()
+        self.bug_detector = DEFAULT_DETECTOR
         
         # Parse commits on initialization
         self._commits: List[CommitInfo] = []
         self._parse_commits()
+        
+        # Version -> commit index so per-version lookups don't scan the list
+        self._commits_by_version: Dict[int, CommitInfo] = {c.version: c for c in self._commits}
+        
+        # Commits don't change after parsing, so callers share read-only tuples,
+        # the bug fix filter runs once and the summary is built on first request
+        self._commits_view: Tuple[CommitInfo, ...] = tuple(self._commits)
+        self._bug_fix_commits: Tuple[CommitInfo, ...] = tuple(c for c in self._commits if c.is_bug_fix)
+        self._summary: Optional[str] = None
     
     def _parse_commits(self) -> None:
         """Parse commits from desc.txt and build CommitInfo objects"""
@@ -53,20 +62,17 @@ class CommitHistory:
         except Exception as e:
             raise InvalidDataFormat(f"Error parsing desc.txt: {e}")
     
-    def get_commits(self) -> List[CommitInfo]:
-        """Returns all commits in chronological order"""
-        return self._commits.copy()
+    def get_commits(self) -> Tuple[CommitInfo, ...]:
+        """Returns all commits in chronological order (a shared tuple; list() it to modify)"""
+        return self._commits_view
     
-    def get_bug_fix_commits(self) -> List[CommitInfo]:
-        """Returns only bug fix commits"""
-        return [c for c in self._commits if c.is_bug_fix]
+    def get_bug_fix_commits(self) -> Tuple[CommitInfo, ...]:
+        """Returns only bug fix commits (a shared tuple; list() it to modify)"""
+        return self._bug_fix_commits
     
     def get_commit_at_version(self, version: int) -> Optional[CommitInfo]:
         """Get commit info for a specific version"""
-        for commit in self._commits:
-            if commit.version == version:
-                return commit
-        return None
+        return self._commits_by_version.get(version)
     
     def get_latest_version(self) -> int:
         """Get the latest version number"""
@@ -80,25 +86,30 @@ class CommitHistory:
     
     def has_bug_fixes(self) -> bool:
         """Check if there are any bug fix commits"""
-        return any(c.is_bug_fix for c in self._commits)
+        return bool(self._bug_fix_commits)
     
     def get_commits_between(self, start_version: int, end_version: int) -> List[CommitInfo]:
         """Get commits between two versions (exclusive start, inclusive end)"""
-        return [c for c in self._commits if start_version < c.version <= end_version]
+        # Commit i has version i + 1, so the range is a slice of the list
+        start = max(start_version, 0)
+        return self._commits[start:max(end_version, start)]
     
     def __len__(self) -> int:
         return len(self._commits)
     
     def __repr__(self) -> str:
-        bug_count = len(self.get_bug_fix_commits())
+        bug_count = len(self._bug_fix_commits)
         return f"CommitHistory(file={self.file_name}, commits={len(self._commits)}, bug_fixes={bug_count})"
     
     def summary(self) -> str:
         """Generate a summary of the commit history"""
+        if self._summary is not None:
+            return self._summary
+        
         lines = [
             f"Commit History for '{self.file_name}'",
             f"Total commits: {len(self._commits)}",
-            f"Bug fixes: {len(self.get_bug_fix_commits())}",
+            f"Bug fixes: {len(self._bug_fix_commits)}",
             "-" * 40,
         ]
         
@@ -106,4 +117,5 @@ class CommitHistory:
             marker = " [BUG FIX]" if commit.is_bug_fix else ""
             lines.append(f"v{commit.version}: {commit.message}{marker}")
         
-        return "\n".join(lines)
\ No newline at end of file
+        self._summary = "\n".join(lines)
+        return self._summary
\ No newline at end of file
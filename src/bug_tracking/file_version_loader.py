@@ -3,10 +3,20 @@ Loads file versions from disk (file_v0.txt, file_v1.txt, etc.)
 Handles preprocessing and caching
 """
 
+import hashlib
+import json
 import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 from ..models import FileVersion, FileVersionNotFound
-from ..diff.preprocessing import preprocess_lines
+from ..diff.preprocessing import preprocess_lines, PREPROCESS_VERSION
+
+# Layout of a disk cache entry; entries written under another layout or
+# preprocessing version are ignored and rewritten
+_DISK_CACHE_FORMAT = 1
 
 
 class FileVersionLoader:
@@ -14,13 +24,37 @@ class FileVersionLoader:
     Loads file versions from disk
     Expects files named {base_name}_v{version}.txt
     """
-    def __init__(self, base_path: str, file_base_name: str):
-        """Initialize the loader"""
+    def __init__(self, base_path: str, file_base_name: str, cache_dir: Optional[str] = None,
+                 cache_max: Optional[int] = 32):
+        """
+        Initialize the loader
+        
+        cache_max bounds how many loaded versions are kept in memory, evicting
+        the least recently used one first (None keeps every version)
+        
+        cache_dir (off by default) keeps each version's lines and preprocessing
+        on disk as JSON, keyed by file mtime and size and by PREPROCESS_VERSION,
+        so later runs and other loaders
+        skip reading and preprocessing unchanged files
+        """
         self.base_path = base_path.rstrip('/')
         self.file_base_name = file_base_name
+        self.cache_dir = cache_dir
         
-        # Cache loaded versions
-        self._cache: Dict[int, FileVersion] = {}
+        # Guards the cache, its counters and the line pool, which
+        # load_version_range's threads share
+        self._lock = threading.Lock()
+        # Cache loaded versions, least recently used first
+        self._cache: "OrderedDict[int, FileVersion]" = OrderedDict()
+        self._cache_max = cache_max
+        self._cache_hits = 0
+        self._cache_misses = 0
+        # One shared copy of each raw line across this file's versions, most
+        # lines being unchanged from version to version (preprocessed lines
+        # are interned by FileVersion itself)
+        self._line_pool: Dict[str, str] = {}
+        # Directory listing (version -> path), taken on first use; see refresh()
+        self._version_paths: Optional[Dict[int, str]] = None
     
     def _get_file_path(self, version: int) -> str:
         """Get the file path for a specific version"""
@@ -34,76 +68,184 @@ class FileVersionLoader:
     def load_version(self, version: int, use_cache: bool = True) -> FileVersion:
         """Load a file version from disk"""
         # Check cache first
-        if use_cache and version in self._cache:
-            return self._cache[version]
+        if use_cache:
+            with self._lock:
+                file_version = self._cache.get(version)
+                if file_version is not None:
+                    self._cache_hits += 1
+                    self._cache.move_to_end(version)
+                    return file_version
+                self._cache_misses += 1
         
         file_path = self._get_file_path(version)
         
-        if not os.path.exists(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
             raise FileVersionNotFound(f"Version {version} not found: {file_path}")
         
+        # Reading and preprocessing run outside the lock; only the shared
+        # line pool and cache updates below are serialized
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                raw_lines = f.readlines()
-            
-            # Strip newlines but preserve content
-            lines = [line.rstrip('\n\r') for line in raw_lines]
-            
-            # Preprocess for matching
-            preprocessed = preprocess_lines(lines)
-            
-            file_version = FileVersion(
-                version=version,
-                file_path=file_path,
-                lines=lines,
-                preprocessed=preprocessed
-            )
-            
-            # Cache the result
-            if use_cache:
-                self._cache[version] = file_version
-            
-            return file_version
-            
+            cached = self._read_disk_cache(file_path, stat)
+            if cached is not None:
+                lines, preprocessed = cached
+            else:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    raw_lines = f.readlines()
+                
+                # Strip newlines but preserve content
+                lines = [line.rstrip('\n\r') for line in raw_lines]
+                
+                # Preprocess for matching
+                preprocessed = preprocess_lines(lines)
+                
+                self._write_disk_cache(file_path, stat, lines, preprocessed)
         except Exception as e:
             raise FileVersionNotFound(f"Error loading version {version}: {e}")
+        
+        with self._lock:
+            line_pool = self._line_pool
+            lines = [line_pool.setdefault(line, line) for line in lines]
+        
+        file_version = FileVersion(
+            version=version,
+            file_path=file_path,
+            lines=lines,
+            preprocessed=preprocessed
+        )
+        
+        # Cache the result
+        if use_cache:
+            with self._lock:
+                self._cache[version] = file_version
+                if self._cache_max is not None:
+                    while len(self._cache) > self._cache_max:
+                        self._cache.popitem(last=False)
+        
+        return file_version
     
-    def load_version_range(self, start: int, end: int) -> List[FileVersion]:
-        """ Load multiple versions efficiently"""
-        versions = []
-        for v in range(start, end + 1):
-            if self.version_exists(v):
-                versions.append(self.load_version(v))
-        return versions
+    def _disk_cache_path(self, file_path: str) -> str:
+        """Sidecar file holding the cached load of file_path"""
+        key = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
     
-    def get_available_versions(self) -> List[int]:
-        """ Scan directory for all available versions."""
-        versions = []
-        
-        # Scan directory for files matching pattern
-        for filename in os.listdir(self.base_path):
-            if filename.startswith(f"{self.file_base_name}_v") and filename.endswith(".txt"):
-                try:
-                    # Extract version number from filename
-                    version_str = filename[len(self.file_base_name) + 2:-4]  #+2 for "_v", -4 for ".txt"
-                    version = int(version_str)
-                    versions.append(version)
-                except ValueError:
-                    continue
+    def _read_disk_cache(self, file_path: str, stat: os.stat_result):
+        """(lines, preprocessed) from the disk cache if it matches the file's mtime and size, else None"""
+        if self.cache_dir is None:
+            return None
+        try:
+            # JSON rather than pickle, so a shared cache dir can't run code on load
+            with open(self._disk_cache_path(file_path), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            stamp = (entry['format'], entry['preprocess_version'], entry['mtime_ns'], entry['size'])
+            lines, preprocessed = entry['lines'], entry['preprocessed']
+        except Exception:
+            # Missing or unreadable entries just mean a normal load
+            return None
+        if stamp != (_DISK_CACHE_FORMAT, PREPROCESS_VERSION, stat.st_mtime_ns, stat.st_size):
+            return None
+        return lines, preprocessed
+    
+    def _write_disk_cache(self, file_path: str, stat: os.stat_result,
+                          lines: List[str], preprocessed: List[str]) -> None:
+        """Store a load in the disk cache (written to a temp file, then renamed into place)"""
+        if self.cache_dir is None:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            entry = {
+                'format': _DISK_CACHE_FORMAT,
+                'preprocess_version': PREPROCESS_VERSION,
+                'mtime_ns': stat.st_mtime_ns,
+                'size': stat.st_size,
+                'lines': lines,
+                'preprocessed': preprocessed,
+            }
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, self._disk_cache_path(file_path))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError:
+            # The cache is an optimization; failing to write it isn't an error
+            pass
+    
+    def load_version_range(self, start: int, end: int, max_workers: int = 8) -> List[FileVersion]:
+        """
+        Load multiple versions efficiently
         
-        return sorted(versions)
+        Existence comes from the cached directory listing, and versions not
+        loaded yet are read on a thread pool (results stay in version order;
+        the loads share the cache under the loader's lock)
+        """
+        versions = [v for v in sorted(self._get_version_paths()) if start <= v <= end]
+        with self._lock:
+            to_load = [v for v in versions if v not in self._cache]
+        loaded = {}
+        if len(to_load) > 1 and max_workers > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(to_load))) as executor:
+                # Keep the results themselves: with a bounded cache, early
+                # versions may already be evicted when the range is larger
+                loaded = dict(zip(to_load, executor.map(self.load_version, to_load)))
+        return [loaded[v] if v in loaded else self.load_version(v) for v in versions]
+    
+    def _get_version_paths(self) -> Dict[int, str]:
+        """version -> path for every version file in the directory, scanned once (see refresh())"""
+        if self._version_paths is None:
+            prefix = f"{self.file_base_name}_v"
+            version_paths = {}
+            
+            # Scan directory for files matching pattern
+            with os.scandir(self.base_path) as entries:
+                for entry in entries:
+                    filename = entry.name
+                    if filename.startswith(prefix) and filename.endswith(".txt"):
+                        try:
+                            # Extract version number from filename
+                            version_str = filename[len(prefix):-4]  # -4 for ".txt"
+                            version_paths[int(version_str)] = entry.path
+                        except ValueError:
+                            continue
+            
+            self._version_paths = version_paths
+        return self._version_paths
+    
+    def get_available_versions(self) -> List[int]:
+        """ Scan directory for all available versions (cached until refresh())."""
+        return sorted(self._get_version_paths())
+    
+    def refresh(self) -> None:
+        """Forget the directory listing so the next lookup rescans it"""
+        self._version_paths = None
     
     def get_latest_version(self) -> int:
         """Get the latest available version number"""
         versions = self.get_available_versions()
         return versions[-1] if versions else -1
     
+    def cache_stats(self) -> Dict[str, Optional[int]]:
+        """Hit/miss counts of the in-memory version cache, with its current and maximum size"""
+        with self._lock:
+            return {
+                'hits': self._cache_hits,
+                'misses': self._cache_misses,
+                'size': len(self._cache),
+                'max': self._cache_max,
+            }
+    
     def clear_cache(self) -> None:
-        """Clear the version cache"""
-        self._cache.clear()
+        """Clear the version cache (and the directory listing)"""
+        with self._lock:
+            self._cache.clear()
+            self._line_pool.clear()
+        self._version_paths = None
     
     def preload_all(self) -> None:
-        """Preload all available versions into cache"""
+        """Preload all available versions into cache (only the last cache_max are kept)"""
         for v in self.get_available_versions():
             self.load_version(v)
     
@@ -2,10 +2,18 @@
 Tracks line numbers through multiple file versions using diff mappings
 """
 
-from typing import List, Optional, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple
 from ..models import FileVersion, LineMapping, LineHistory, BugSignature, BugMatch
 from .bug_signature import compute_diff_and_mapping
-from ..diff.matcher import normalized_levenshtein, cosine_similarity, combined_similarity
+from ..diff.matcher import (
+    normalized_levenshtein, cosine_similarity, combined_similarity,
+    vectorize, cosine_from_vectors
+)
+
+# Float slack on the window upper bound in find_bug_in_version, so rounding
+# never skips a window that would have tied or won
+_BOUND_SLACK = 1e-9
 
 
 def track_line_backward(
@@ -55,9 +63,21 @@ def track_lines_backward(
 def find_bug_in_version(
     file_version: FileVersion,
     bug_signature: BugSignature,
-    threshold: float = 0.7
+    threshold: float = 0.7,
+    hint_start_idx: Optional[int] = None,
+    pair_scores: Optional[Dict[Tuple[str, str], float]] = None
 ) -> Optional[BugMatch]:
-    """Search for bug signature in a file version"""
+    """
+    Search for bug signature in a file version
+    
+    hint_start_idx is a window start to score first (e.g. where the bug sits in
+    the next newer version). It only changes how much work the search does:
+    once a good score is known, windows whose line lengths alone rule out
+    beating it are skipped. The result is the same with or without a hint
+    
+    pair_scores memoizes normalized_levenshtein by (bug line, file line); pass
+    the same dict when searching several versions with one signature
+    """
     if bug_signature.is_empty():
         return None
     
@@ -72,29 +92,71 @@ def find_bug_in_version(
     if len(file_lines) < num_buggy:
         return None
     
-    best_match = None
+    num_windows = len(file_lines) - num_buggy + 1
+    start_order = range(num_windows)
+    if hint_start_idx is not None and 0 <= hint_start_idx < num_windows:
+        start_order = [hint_start_idx]
+        start_order.extend(range(hint_start_idx))
+        start_order.extend(range(hint_start_idx + 1, num_windows))
+    
+    # Line lengths, 0 for blank lines, computed once per call: they give both
+    # the upper bound below and the empty-line checks when scoring
+    bug_lengths = [len(line) if line.strip() else 0 for line in buggy_lines]
+    file_lengths = [len(line) if line.strip() else 0 for line in file_lines]
+    
+    if pair_scores is None:
+        pair_scores = {}
+    
+    best_start = None
     best_score = 0.0
+    # Smallest bound sum (below) a window needs to reach the threshold; only
+    # moves when the best score does, so the loop compares against a constant
+    min_bound_sum = _min_bound_sum(threshold, num_buggy)
     
     # Sliding window search
-    for start_idx in range(len(file_lines) - num_buggy + 1):
+    for start_idx in start_order:
+        # normalized_levenshtein can't exceed shorter/longer length and the
+        # context boost can't exceed 1, so skip windows that can't win
+        bound_sum = float(num_buggy)
+        if min_bound_sum > 0.0:
+            bound_sum = 0.0
+            for bug_len, file_len in zip(bug_lengths, file_lengths[start_idx:start_idx + num_buggy]):
+                if bug_len and file_len:
+                    bound_sum += bug_len / file_len if bug_len < file_len else file_len / bug_len
+                elif not bug_len and not file_len:
+                    bound_sum += 1.0
+            if bound_sum < min_bound_sum:
+                continue
+        
         window = file_lines[start_idx:start_idx + num_buggy]
+        window_lengths = file_lengths[start_idx:start_idx + num_buggy]
         
-        # Calculate similarity for each line pair
-        line_scores = []
-        for i, (bug_line, window_line) in enumerate(zip(buggy_lines, window)):
-            if not bug_line.strip() and not window_line.strip():
+        # Calculate similarity for each line pair. best_possible is bound_sum
+        # with the lines scored so far swapped for their real scores, so the
+        # window is dropped as soon as it can no longer reach the cutoff
+        score_sum = 0.0
+        best_possible = bound_sum
+        for bug_line, window_line, bug_len, file_len in zip(buggy_lines, window, bug_lengths, window_lengths):
+            if not bug_len and not file_len:
                 # Both empty lines indicates a perfect match
-                line_scores.append(1.0)
-            elif not bug_line.strip() or not window_line.strip():
+                score_sum += 1.0
+            elif not bug_len or not file_len:
                 # One empty, one not indicates no match
-                line_scores.append(0.0)
+                pass
             else:
-                score = normalized_levenshtein(bug_line, window_line)
-                line_scores.append(score)
-        
-        # Average similarity across all lines
-        if line_scores:
-            avg_score = sum(line_scores) / len(line_scores)
+                # Unchanged lines recur across versions (and repeat within a file)
+                score = pair_scores.get((bug_line, window_line))
+                if score is None:
+                    score = normalized_levenshtein(bug_line, window_line)
+                    pair_scores[(bug_line, window_line)] = score
+                score_sum += score
+                
+                best_possible += score - (bug_len / file_len if bug_len < file_len else file_len / bug_len)
+                if best_possible < min_bound_sum:
+                    break
+        else:
+            # Average similarity across all lines
+            avg_score = score_sum / num_buggy
             
             # Boost score if context matches
             context_boost = _calculate_context_boost(
@@ -103,16 +165,31 @@ def find_bug_in_version(
             
             final_score = 0.8 * avg_score + 0.2 * context_boost
             
-            if final_score > best_score and final_score >= threshold:
+            # Ties go to the earliest window, as in a plain front-to-back scan
+            if final_score >= threshold and (
+                final_score > best_score or
+                (best_start is not None and final_score == best_score and start_idx < best_start)
+            ):
                 best_score = final_score
-                best_match = BugMatch(
-                    version=file_version.version,
-                    line_numbers=list(range(start_idx, start_idx + num_buggy)),
-                    matched_lines=[file_version.lines[i] for i in range(start_idx, start_idx + num_buggy)],
-                    confidence=final_score
-                )
+                best_start = start_idx
+                min_bound_sum = _min_bound_sum(best_score, num_buggy)
     
-    return best_match
+    if best_start is None:
+        return None
+    return BugMatch(
+        version=file_version.version,
+        line_numbers=list(range(best_start, best_start + num_buggy)),
+        matched_lines=file_version.lines[best_start:best_start + num_buggy],
+        confidence=best_score
+    )
+
+
+def _min_bound_sum(score: float, num_buggy: int) -> float:
+    """
+    Sum of per-line upper bounds a window needs for 0.8 * avg + 0.2 * context
+    to reach score (with context at its maximum of 1), less _BOUND_SLACK
+    """
+    return (score - _BOUND_SLACK - 0.2) / 0.8 * num_buggy
 
 
 def _calculate_context_boost(
@@ -130,10 +207,9 @@ def _calculate_context_boost(
         file_context_before = file_version.lines[context_start:start_idx]
         
         if file_context_before:
-            # Compare context
-            file_ctx_str = " ".join(file_context_before)
-            sig_ctx_str = " ".join(bug_signature.context_before)
-            scores.append(cosine_similarity(file_ctx_str, sig_ctx_str))
+            # Compare context (the signature side is vectorized once per signature)
+            file_ctx_vector = vectorize(" ".join(file_context_before))
+            scores.append(cosine_from_vectors(file_ctx_vector, bug_signature.context_before_vector))
     
     # Check context after
     if bug_signature.context_after:
@@ -141,9 +217,8 @@ def _calculate_context_boost(
         file_context_after = file_version.lines[start_idx + num_lines:context_end]
         
         if file_context_after:
-            file_ctx_str = " ".join(file_context_after)
-            sig_ctx_str = " ".join(bug_signature.context_after)
-            scores.append(cosine_similarity(file_ctx_str, sig_ctx_str))
+            file_ctx_vector = vectorize(" ".join(file_context_after))
+            scores.append(cosine_from_vectors(file_ctx_vector, bug_signature.context_after_vector))
     
     return sum(scores) / len(scores) if scores else 0.5
 
@@ -151,16 +226,71 @@ def _calculate_context_boost(
 def find_bug_introduction(
     file_versions: List[FileVersion],
     bug_signature: BugSignature,
-    threshold: float = 0.7
+    threshold: float = 0.7,
+    max_workers: Optional[int] = 1
 ) -> tuple:
-    """Find when bug was introduced by searching backward through versions"""
+    """
+    Find when bug was introduced by searching backward through versions
+    
+    Each version's search starts from where the bug was found in the version
+    after it. That only speeds the search up; the matches found are the same
+    
+    max_workers other than 1 searches the versions on a process pool instead
+    (None for one worker per CPU). Every search then starts from the signature's
+    own lines, and versions still queued once the bug stops matching are cancelled
+    """
+    # Signature lines are positions in the version the fix was made against,
+    # normally the first (newest) one searched
+    hint_start_idx = min(bug_signature.line_numbers) if bug_signature.line_numbers else None
+    
+    if max_workers == 1 or len(file_versions) < 2:
+        return _collect_introduction(_search_versions(
+            file_versions, bug_signature, threshold, hint_start_idx
+        ))
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(find_bug_in_version, file_version, bug_signature, threshold, hint_start_idx)
+            for file_version in file_versions
+        ]
+        try:
+            # Results are consumed newest to oldest, so the answer matches the serial search
+            return _collect_introduction(
+                (file_version, future.result()) for file_version, future in zip(file_versions, futures)
+            )
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def _search_versions(
+    file_versions: List[FileVersion],
+    bug_signature: BugSignature,
+    threshold: float,
+    hint_start_idx: Optional[int]
+) -> Iterator[Tuple[FileVersion, Optional[BugMatch]]]:
+    """(version, match) for each version in turn, each search hinted by the one before"""
+    # Line pair scores carry over between versions, most lines being unchanged
+    pair_scores: Dict[Tuple[str, str], float] = {}
+    
+    for i, file_version in enumerate(file_versions):
+        match = find_bug_in_version(file_version, bug_signature, threshold, hint_start_idx, pair_scores)
+        yield file_version, match
+        
+        if match:
+            # Most bugs barely move between adjacent versions
+            hint_start_idx = match.line_numbers[0]
+
+
+def _collect_introduction(
+    version_matches: Iterable[Tuple[FileVersion, Optional[BugMatch]]]
+) -> tuple:
+    """(introduction_version, matches_by_version) from matches ordered newest to oldest"""
     matches_by_version: Dict[int, BugMatch] = {}
     introduction_version = None
     
     # Search from newest to oldest
-    for file_version in file_versions:
-        match = find_bug_in_version(file_version, bug_signature, threshold)
-        
+    for file_version, match in version_matches:
         if match:
             matches_by_version[file_version.version] = match
         else:
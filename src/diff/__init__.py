@@ -3,13 +3,18 @@ diff - preprocessing, similarity matching, and diff algorithms
 """
 
 from .preprocessing import preprocess_line, preprocess_lines, preprocess_file
-from .matcher import match_lines, normalized_levenshtein, cosine_similarity, levenshtein, combined_similarity, get_context
-from .diff import get_diff
-from .diff_hybrid import get_diff_hybrid, get_diff_with_hash, hash_diff
+from .matcher import (
+    match_lines, normalized_levenshtein, cosine_similarity, levenshtein, combined_similarity, get_context,
+    vectorize, cosine_from_vectors, vector_norm, cosine_from_norms
+)
+from .diff import get_diff, get_diff_raw
+from .diff_hybrid import get_diff_hybrid, get_diff_hybrid_raw, get_diff_with_hash, hash_diff
 
 __all__ = [
     'preprocess_line', 'preprocess_lines', 'preprocess_file',
     'match_lines', 'normalized_levenshtein', 'cosine_similarity',
     'levenshtein', 'combined_similarity', 'get_context',
-    'get_diff', 'get_diff_hybrid', 'get_diff_with_hash', 'hash_diff',
+    'vectorize', 'cosine_from_vectors', 'vector_norm', 'cosine_from_norms',
+    'get_diff', 'get_diff_raw', 'get_diff_hybrid', 'get_diff_hybrid_raw',
+    'get_diff_with_hash', 'hash_diff',
 ]
\ No newline at end of file
@@ -1,6 +1,16 @@
-from typing import List 
+from array import array
+from typing import List, Optional, Tuple
 
-def reconstruct_from_trace(old_file_text, new_file_text, trace):
+# Marks a diagonal that was not reached (y < 0) at a given step
+UNSET = -1
+
+# Edit kinds returned by get_diff_raw
+MATCH = "match"
+DELETE = "delete"
+INSERT = "insert"
+
+
+def reconstruct_from_trace(old_file_text, new_file_text, trace_storage, trace):
     edits = []
     x, y = len(old_file_text), len(new_file_text)
 
@@ -9,68 +19,124 @@ def reconstruct_from_trace(old_file_text, new_file_text, trace):
         if D == 0:
             # At D=0, only snake (matches) from origin
             while x > 0 and y > 0:
-                edits.append(f"{x}:{y}")
+                edits.append((MATCH, x, y))
                 x -= 1
                 y -= 1
             break
-        
-        # V is state before this edit (at D-1)
-        V = trace[D - 1]
+
+        # V is state before this edit (at D-1), stored as diagonals -(D-1)..(D-1)
+        base = trace[D - 1] + (D - 1)
         k = x - y
 
         # Determine predecessor diagonal
-        if k == -D or (k != D and V.get(k-1, -1) < V.get(k+1, -1)):
+        if k == -D or (k != D and trace_storage[base + k - 1] < trace_storage[base + k + 1]):
             k_prev = k + 1
-            x_prev = V.get(k_prev, 0)
-            y_prev = x_prev - k_prev
             op = "insert"
         else:
             k_prev = k - 1
-            x_prev = V.get(k_prev, 0)
-            y_prev = x_prev - k_prev
             op = "delete"
+        x_prev = trace_storage[base + k_prev]
+        if x_prev == UNSET:
+            x_prev = 0
+        y_prev = x_prev - k_prev
 
         # Snake backwards (matches)
         while x > x_prev and y > y_prev:
-            edits.append(f"{x}:{y}")
+            edits.append((MATCH, x, y))
             x -= 1
             y -= 1
 
         # Add edit that changed D
         if op == "insert":
             y -= 1
-            edits.append(f"{y+1}+")
+            edits.append((INSERT, None, y+1))
         elif op == "delete":
             x -= 1
-            edits.append(f"{x+1}-")
+            edits.append((DELETE, x+1, None))
 
     edits.reverse()
     return edits
 
-def get_diff(old_file_text: List[List[str]], new_file_text: List[List[str]]):
-    mapping = []
-    max_diffs = len(old_file_text) + len(new_file_text)
-    frontier = {1: 0}
+def _myers_core(old_seq, new_seq, max_d):
+    """Run the Myers forward pass, returning (trace_storage, trace), or None once more than max_d edits are needed"""
+    n, m = len(old_seq), len(new_seq)
+    max_diffs = n + m
+    # Single frontier indexed by k + offset, reused across steps. Step D only
+    # writes diagonals of D's parity and only reads the other parity, so the
+    # previous step's values are never clobbered while they are still needed.
+    offset = max_diffs + 1
+    V = array('i', [UNSET]) * (2 * offset + 1)
+    V[1 + offset] = 0
+    # Snapshots of diagonals -D..D for each step live in one flat buffer;
+    # trace[D] is where step D's slice starts
+    trace_storage = array('i')
     trace = []
     for ops in range(max_diffs+1):
-        V = {}
+        if ops > max_d:
+            return None
         for k in range(-ops, ops+1, 2):
             # k = diagonal, insertion raises by 1, deletion lowers by 1
-            # frontier[k] = max x reachable with <= D ops on diagonal k
-            if k == -ops or (k != ops and frontier.get(k-1, -1) < frontier.get(k+1, 0)):
-                x = frontier.get(k+1, 0)
+            # V[k] = max x reachable with <= D ops on diagonal k
+            prev_down = V[k - 1 + offset]
+            prev_right = V[k + 1 + offset]
+            if k == -ops or (k != ops and prev_down < (0 if prev_right == UNSET else prev_right)):
+                x = 0 if prev_right == UNSET else prev_right
             else:
-                x = frontier.get(k-1, 0) + 1
+                x = (0 if prev_down == UNSET else prev_down) + 1
             y = x-k
             if y < 0:
+                V[k + offset] = UNSET
                 continue
-            while x < len(old_file_text) and y < len(new_file_text) and old_file_text[x] == new_file_text[y]:
+            while x < n and y < m and old_seq[x] == new_seq[y]:
                 x += 1
                 y += 1
-            V[k] = x
-            
-            if x >= len(old_file_text) and y >= len(new_file_text):
-                trace.append(V.copy())
-                return reconstruct_from_trace(old_file_text, new_file_text, trace)
-        trace.append(V.copy())
-        frontier = V
\ No newline at end of file
+            V[k + offset] = x
+
+            if x >= n and y >= m:
+                trace.append(len(trace_storage))
+                trace_storage.extend(V[offset - ops:offset + ops + 1])
+                return trace_storage, trace
+        trace.append(len(trace_storage))
+        trace_storage.extend(V[offset - ops:offset + ops + 1])
+    return trace_storage, trace
+
+
+def _line_ids(old_file_text, new_file_text):
+    """Map each distinct line to a small int so the snake loop compares ints, not strings"""
+    ids = {}
+    old_ids = array('i', [ids.setdefault(line, len(ids)) for line in old_file_text])
+    new_ids = array('i', [ids.setdefault(line, len(ids)) for line in new_file_text])
+    return old_ids, new_ids
+
+
+def get_diff_raw(old_file_text: List[str], new_file_text: List[str],
+                 max_d: Optional[int] = None) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Myers diff as (kind, old_line, new_line) tuples (1-based, None for the missing side)
+
+    max_d (off by default) is an edit budget: if more than max_d edits are
+    needed the search stops and every old line is reported deleted and every
+    new line inserted, bounding the worst case at O(max_d * N) instead of O(N^2)
+    """
+    if max_d is None:
+        # Every diff fits in len(old) + len(new) edits, so this never gives up
+        max_d = len(old_file_text) + len(new_file_text)
+    old_ids, new_ids = _line_ids(old_file_text, new_file_text)
+    result = _myers_core(old_ids, new_ids, max_d)
+    if result is None:
+        return ([(DELETE, x, None) for x in range(1, len(old_file_text) + 1)] +
+                [(INSERT, None, y) for y in range(1, len(new_file_text) + 1)])
+    trace_storage, trace = result
+    return reconstruct_from_trace(old_file_text, new_file_text, trace_storage, trace)
+
+
+def get_diff(old_file_text: List[str], new_file_text: List[str], max_d: Optional[int] = None):
+    edits = []
+    for kind, x, y in get_diff_raw(old_file_text, new_file_text, max_d):
+        if kind == MATCH:
+            edits.append(f"{x}:{y}")
+        elif kind == DELETE:
+            edits.append(f"{x}-")
+        else:
+            edits.append(f"{y}+")
+    return edits
@@ -8,51 +8,128 @@ Output format:
 - 'x+' = Insertion
 """
 
-from typing import List
-from .diff import get_diff as get_diff_exact
+import threading
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from itertools import compress, islice
+from typing import List, Optional, Tuple
+from .diff import get_diff_raw, MATCH, DELETE, INSERT
 from .matcher import match_lines
 import hashlib
 
+# Edit kind for similarity matches in get_diff_hybrid_raw (alongside MATCH/DELETE/INSERT)
+SIMILAR = "similar"
 
-def get_diff_hybrid(old_file_text: List[List[str]], new_file_text: List[List[str]], 
-                   similarity_threshold=0.6, use_similarity=True):
-    """Hybrid diff: Exact matches first, then similarity matching for remaining lines"""
-    # Convert List[List[str]] to List[str] for similarity matching
-    old_lines = [line[0] if isinstance(line, list) and len(line) > 0 else str(line) for line in old_file_text]
-    new_lines = [line[0] if isinstance(line, list) and len(line) > 0 else str(line) for line in new_file_text]
+# Flips a 0/1 match bitmap so compress() can pick out the unmatched indices
+_INVERT_BITMAP = bytes.maketrans(b'\x00\x01', b'\x01\x00')
+
+
+def _unique_anchors(old_lines: List[str], new_lines: List[str], start: int = 0) -> List[Tuple[int, int]]:
+    """
+    Pair lines that occur exactly once in each file and keep the longest in-order subset
+    
+    Only lines from index start on (in both files) are considered as anchors
+    """
+    old_counts = Counter(old_lines)
+    new_counts = Counter(new_lines)
+    new_positions = {
+        line: j for j, line in enumerate(islice(new_lines, start, None), start)
+        if new_counts[line] == 1
+    }
+    candidates = [
+        (i, new_positions[line]) for i, line in enumerate(islice(old_lines, start, None), start)
+        if old_counts[line] == 1 and line in new_positions
+    ]
+    
+    # Longest increasing subsequence over new indices (patience sorting)
+    tails = []
+    tail_idx = []
+    prev = [-1] * len(candidates)
+    for c, (_, j) in enumerate(candidates):
+        pos = bisect_left(tails, j)
+        if pos == len(tails):
+            tails.append(j)
+            tail_idx.append(c)
+        else:
+            tails[pos] = j
+            tail_idx[pos] = c
+        prev[c] = tail_idx[pos - 1] if pos > 0 else -1
+    
+    anchors = []
+    c = tail_idx[-1] if tail_idx else -1
+    while c != -1:
+        anchors.append(candidates[c])
+        c = prev[c]
+    anchors.reverse()
+    return anchors
+
+
+def _common_prefix_len(old_lines: List[str], new_lines: List[str]) -> int:
+    """Number of leading lines the two files share"""
+    limit = min(len(old_lines), len(new_lines))
+    prefix_len = 0
+    while prefix_len < limit and old_lines[prefix_len] == new_lines[prefix_len]:
+        prefix_len += 1
+    return prefix_len
+
+
+def _exact_matches(old_lines: List[str], new_lines: List[str]) -> List[Tuple[int, int]]:
+    """Exact (old, new) matches (0-based): unique-line anchors first, myers on the gaps between them"""
+    # Myers always takes the common prefix as its opening snake, so match it
+    # up front and only look for anchors after it. Uniqueness is still counted
+    # over the whole file so the anchors are the same as without the shortcut
+    prefix_len = _common_prefix_len(old_lines, new_lines)
+    anchors = _unique_anchors(old_lines, new_lines, prefix_len)
+    # End-of-file sentinel closes the last gap; with no anchors this is one full myers run
+    anchors_with_end = anchors + [(len(old_lines), len(new_lines))]
+    
+    matches = [(i, i) for i in range(prefix_len)]
+    old_start, new_start = prefix_len, prefix_len
+    for old_anchor, new_anchor in anchors_with_end:
+        # Only run myers when both sides of the gap are non-empty
+        if old_anchor > old_start and new_anchor > new_start:
+            gap_diff = get_diff_raw(old_lines[old_start:old_anchor], new_lines[new_start:new_anchor])
+            for kind, old_idx, new_idx in gap_diff:
+                if kind == MATCH:
+                    # Gap ops are 1-based and relative to the slice
+                    matches.append((old_start + old_idx - 1, new_start + new_idx - 1))
+        if old_anchor < len(old_lines):
+            matches.append((old_anchor, new_anchor))
+        old_start, new_start = old_anchor + 1, new_anchor + 1
+    return matches
+
+
+def get_diff_hybrid_raw(old_file_text: List[str], new_file_text: List[str],
+                        similarity_threshold=0.6, use_similarity=True) -> List[Tuple[str, Optional[int], Optional[int]]]:
+    """
+    Hybrid diff as (kind, old_line, new_line) tuples (1-based, None for the missing side)
     
-    # Get exact matches using myers algorithm
-    exact_diff = get_diff_exact(old_file_text, new_file_text)
+    kind is MATCH, SIMILAR, DELETE or INSERT. Both inputs are List[str], one
+    preprocessed line per entry (as returned by preprocess_file)
+    """
+    # Check the shape once here rather than per line; both passes compare plain strings
+    assert all(not lines or isinstance(lines[0], str) for lines in (old_file_text, new_file_text)), \
+        "get_diff_hybrid_raw expects List[str] inputs"
+    old_lines = old_file_text
+    new_lines = new_file_text
     
-    # Extract exact matches and track matched lines
+    # Get exact matches: unique-line anchors, then myers algorithm between them
+    # Extract exact matches and track matched lines (bitmaps indexed by 0-based line)
     exact_matches = {}
-    old_matched = set()
-    new_matched = set()
+    old_matched = bytearray(len(old_lines))
+    new_matched = bytearray(len(new_lines))
     
-    for op in exact_diff:
-        if ':' in op:
-            # Exact match (convert 1-based to 0-based)
-            old_idx, new_idx = map(int, op.split(':'))
-            old_idx_0based = old_idx - 1
-            new_idx_0based = new_idx - 1
-            exact_matches[old_idx_0based] = new_idx_0based
-            old_matched.add(old_idx_0based)
-            new_matched.add(new_idx_0based)
-        elif op.endswith('-'):
-            # Deletion (convert to 0-based)
-            old_idx_1based = int(op[:-1])
-            old_idx = old_idx_1based - 1
-        elif op.endswith('+'):
-            # Insertion (convert to 0-based)
-            new_idx_1based = int(op[:-1])
-            new_idx = new_idx_1based - 1
+    for old_idx_0based, new_idx_0based in _exact_matches(old_lines, new_lines):
+        exact_matches[old_idx_0based] = new_idx_0based
+        old_matched[old_idx_0based] = 1
+        new_matched[new_idx_0based] = 1
     
     # Use similarity matching for unmatched lines
     similarity_matches = {}
     
     if use_similarity:
-        unmatched_old_indices = [i for i in range(len(old_lines)) if i not in old_matched]
-        unmatched_new_indices = [i for i in range(len(new_lines)) if i not in new_matched]
+        unmatched_old_indices = list(compress(range(len(old_lines)), old_matched.translate(_INVERT_BITMAP)))
+        unmatched_new_indices = list(compress(range(len(new_lines)), new_matched.translate(_INVERT_BITMAP)))
         
         if unmatched_old_indices and unmatched_new_indices:
             unmatched_old_lines = [old_lines[i] for i in unmatched_old_indices]
@@ -67,38 +144,88 @@ def get_diff_hybrid(old_file_text: List[List[str]], new_file_text: List[List[str
                     old_idx_0based = unmatched_old_indices[old_1based - 1]
                     new_idx_0based = unmatched_new_indices[new_1based - 1]
                     similarity_matches[old_idx_0based] = new_idx_0based
-                    old_matched.add(old_idx_0based)
-                    new_matched.add(new_idx_0based)
+                    old_matched[old_idx_0based] = 1
+                    new_matched[new_idx_0based] = 1
     
     # Build final result
     result = []
     
     for old_idx in range(len(old_lines)):
         if old_idx in exact_matches:
-            new_idx = exact_matches[old_idx]
-            result.append(f"{old_idx+1}:{new_idx+1}")
+            result.append((MATCH, old_idx + 1, exact_matches[old_idx] + 1))
         elif old_idx in similarity_matches:
-            new_idx = similarity_matches[old_idx]
-            result.append(f"{old_idx+1}~{new_idx+1}")
-        elif old_idx not in old_matched:
-            result.append(f"{old_idx+1}-")
+            result.append((SIMILAR, old_idx + 1, similarity_matches[old_idx] + 1))
+        else:
+            result.append((DELETE, old_idx + 1, None))
     
     # Add insertions
     for new_idx in range(len(new_lines)):
-        if new_idx not in new_matched:
-            result.append(f"{new_idx+1}+")
+        if not new_matched[new_idx]:
+            result.append((INSERT, None, new_idx + 1))
     
     return result
 
 
+def format_diff_ops(raw_ops: List[Tuple[str, Optional[int], Optional[int]]]) -> List[str]:
+    """Render get_diff_hybrid_raw tuples as 'x:y', 'x~y', 'x-' and 'y+' strings"""
+    result = []
+    for kind, old_line, new_line in raw_ops:
+        if kind == MATCH:
+            result.append(f"{old_line}:{new_line}")
+        elif kind == SIMILAR:
+            result.append(f"{old_line}~{new_line}")
+        elif kind == DELETE:
+            result.append(f"{old_line}-")
+        else:
+            result.append(f"{new_line}+")
+    return result
+
+
+def get_diff_hybrid(old_file_text: List[str], new_file_text: List[str], 
+                   similarity_threshold=0.6, use_similarity=True):
+    """Hybrid diff: Exact matches first, then similarity matching for remaining lines"""
+    return format_diff_ops(get_diff_hybrid_raw(old_file_text, new_file_text,
+                                               similarity_threshold, use_similarity))
+
+
 def hash_diff(diff_result: List[str]) -> str:
-    """Generate md5 hash of diff result"""
-    diff_str = '|'.join(diff_result)
-    return hashlib.md5(diff_str.encode()).hexdigest()
+    """Generate a 64-bit blake2b hash of diff result (identifier only, not for security)"""
+    # Feed ops straight into the hasher instead of building the joined string;
+    # ops are digits plus ':~+-', so ascii encoding is exact
+    h = hashlib.blake2b(digest_size=8)
+    for i, op in enumerate(diff_result):
+        if i:
+            h.update(b'|')
+        h.update(op.encode('ascii'))
+    return h.hexdigest()
+
+
+# Recent get_diff_with_hash results, least recently used first. Keyed on
+# digests of the inputs, so entries hold the diffs but not the files
+_DIFF_HASH_CACHE_MAX = 32
+_diff_hash_cache: "OrderedDict[tuple, Tuple[Tuple[str, ...], str]]" = OrderedDict()
+_diff_hash_cache_lock = threading.Lock()
+
+
+def _lines_digest(lines: List[str]) -> bytes:
+    """128-bit digest of a file's lines (repr keeps line boundaries unambiguous)"""
+    return hashlib.blake2b(repr(lines).encode('utf-8'), digest_size=16).digest()
 
 
-def get_diff_with_hash(old_file_text: List[List[str]], new_file_text: List[List[str]], similarity_threshold=0.6, use_similarity=True):
-    """Get diff result with hash"""
-    diff_result = get_diff_hybrid(old_file_text, new_file_text, similarity_threshold, use_similarity)
-    diff_hash = hash_diff(diff_result)
-    return {"diff": diff_result, "hash": diff_hash}
\ No newline at end of file
+def get_diff_with_hash(old_file_text: List[str], new_file_text: List[str], similarity_threshold=0.6, use_similarity=True):
+    """Get diff result with hash (repeated calls on unchanged inputs are served from a small cache)"""
+    key = (_lines_digest(old_file_text), _lines_digest(new_file_text), similarity_threshold, use_similarity)
+    with _diff_hash_cache_lock:
+        cached = _diff_hash_cache.get(key)
+        if cached is not None:
+            _diff_hash_cache.move_to_end(key)
+    if cached is None:
+        diff_result = get_diff_hybrid(old_file_text, new_file_text, similarity_threshold, use_similarity)
+        cached = tuple(diff_result), hash_diff(diff_result)
+        with _diff_hash_cache_lock:
+            _diff_hash_cache[key] = cached
+            while len(_diff_hash_cache) > _DIFF_HASH_CACHE_MAX:
+                _diff_hash_cache.popitem(last=False)
+    diff_result, diff_hash = cached
+    # Fresh list per call so callers can't mutate the cached entry
+    return {"diff": list(diff_result), "hash": diff_hash}
\ No newline at end of file
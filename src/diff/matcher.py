@@ -5,10 +5,26 @@ matcher.py - core line-matching logic using content and context similarity
 import difflib
 import math
 from collections import Counter
+from functools import lru_cache
+from itertools import repeat
+
+# Weight of content (levenshtein) vs context (cosine) similarity in combined_similarity
+CONTENT_WEIGHT = 0.6
+
+# Float slack on the score upper bounds in match_lines, so rounding never
+# skips a pair that would have tied or won
+_BOUND_SLACK = 1e-9
 
 
 def levenshtein(a: str, b: str) -> int:
-    """Compute levenshtein edit distance between two strings using 2D DP"""
+    """
+    Compute levenshtein edit distance between two strings
+
+    Uses Myers' bit-parallel algorithm (Hyyro's formulation): one DP column is
+    held as bit-vectors over the shorter string, so each character of the longer
+    string costs a handful of integer ops instead of a full column of DP updates.
+    Python ints are arbitrary precision, so any line length fits in one vector.
+    """
     if a == b:
         return 0
     if len(a) == 0:
@@ -16,31 +32,40 @@ def levenshtein(a: str, b: str) -> int:
     if len(b) == 0:
         return len(a)
 
-    m, n = len(a), len(b)
-    
-    # 2D DP table
-    dp = [[0] * (n + 1) for _ in range(m + 1)]
-    
-    # Base cases
-    for i in range(m + 1):
-        dp[i][0] = i
-    for j in range(n + 1):
-        dp[0][j] = j
-    
-    # Fill table
-    for i in range(1, m + 1):
-        for j in range(1, n + 1):
-            cost = 0 if a[i - 1] == b[j - 1] else 1
-            dp[i][j] = min(
-                # Deletion
-                dp[i - 1][j] + 1,
-                # Insertion
-                dp[i][j - 1] + 1,
-                # Substitution
-                dp[i - 1][j - 1] + cost
-            )
-    
-    return dp[m][n]
+    # Pattern = shorter string, so the bit-vectors are as narrow as possible
+    if len(a) > len(b):
+        a, b = b, a
+    m = len(a)
+
+    # Bitmask of the positions where each character occurs in the pattern
+    peq = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    # Vertical positive/negative deltas of the current DP column
+    vp = mask
+    vn = 0
+    score = m
+
+    for ch in b:
+        eq = peq.get(ch, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        # Horizontal deltas
+        hp = vn | ~(xh | vp)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn = hn << 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+
+    return score
 
 
 def normalized_levenshtein(a: str, b: str) -> float:
@@ -52,6 +77,12 @@ def normalized_levenshtein(a: str, b: str) -> float:
     return 1.0 - (dist / max_len)
 
 
+@lru_cache(maxsize=4096)
+def _char_bag(line: str) -> Counter:
+    """Character multiset of a line (callers must not modify it)"""
+    return Counter(line)
+
+
 def get_context(lines, idx, window=4) -> str:
     """Build context string from surrounding lines"""
     start = max(0, idx - window)
@@ -59,36 +90,51 @@ def get_context(lines, idx, window=4) -> str:
     return " ".join(lines[start:end])
 
 
-def cosine_similarity(text1: str, text2: str) -> float:
-    """Compute cosine similarity between two strings as bags of words"""
-    if not text1.strip() and not text2.strip():
-        return 1.0
-    if not text1.strip() or not text2.strip():
-        return 0.0
+def vectorize(text: str) -> Counter:
+    """Bag-of-words term counts of a string, as compared by cosine_similarity"""
+    return Counter(text.split())
 
-    words1 = text1.split()
-    words2 = text2.split()
 
-    c1 = Counter(words1)
-    c2 = Counter(words2)
+def vector_norm(c: Counter) -> float:
+    """Euclidean norm of a vectorize() result"""
+    return math.sqrt(sum(v * v for v in c.values()))
 
-    # Dot product
-    common = set(c1.keys()) & set(c2.keys())
-    dot = sum(c1[w] * c2[w] for w in common)
 
-    # Norms
-    norm1 = math.sqrt(sum(v * v for v in c1.values()))
-    norm2 = math.sqrt(sum(v * v for v in c2.values()))
+def cosine_from_vectors(c1: Counter, c2: Counter) -> float:
+    """Cosine similarity of two vectorize() results (lets a fixed side be vectorized once)"""
+    return cosine_from_norms(c1, vector_norm(c1), c2, vector_norm(c2))
+
+
+def cosine_from_norms(c1: Counter, norm1: float, c2: Counter, norm2: float) -> float:
+    """cosine_from_vectors with both norms (vector_norm) already computed"""
+    if not c1 and not c2:
+        return 1.0
+    if not c1 or not c2:
+        return 0.0
     if norm1 == 0 or norm2 == 0:
         return 0.0
 
+    # Dot product
+    common = c1.keys() & c2.keys()
+    dot = sum(c1[w] * c2[w] for w in common)
+
     return dot / (norm1 * norm2)
 
 
-def combined_similarity(line_a: str, line_b: str, ctx_a: str, ctx_b: str, alpha: float = 0.6) -> float:
+def cosine_similarity(text1: str, text2: str) -> float:
+    """Compute cosine similarity between two strings as bags of words"""
+    return cosine_from_vectors(vectorize(text1), vectorize(text2))
+
+
+def combined_similarity(line_a: str, line_b: str, ctx_a: str, ctx_b: str, alpha: float = CONTENT_WEIGHT) -> float:
     """Combine content (levenshtein) and context (cosine) similarities"""
     content_sim = normalized_levenshtein(line_a, line_b)
     context_sim = cosine_similarity(ctx_a, ctx_b)
+    return _weigh(content_sim, context_sim, alpha)
+
+
+def _weigh(content_sim: float, context_sim: float, alpha: float = CONTENT_WEIGHT) -> float:
+    """Weighted sum behind combined_similarity"""
     return alpha * content_sim + (1.0 - alpha) * context_sim
 
 
@@ -115,11 +161,26 @@ def match_lines(old_lines, new_lines, context_window=4,
         else:
             unmatched_blocks.append(((i1, i2), (j1, j2)))
 
+    # levenshtein(a, b) >= |len(a) - len(b)|, so content similarity is at most
+    # min_len / max_len; with context similarity at most 1, a pair whose length
+    # ratio is below this floor can never reach the threshold and is skipped
+    # before any distance is computed (epsilon keeps the cut conservative)
+    min_length_ratio = (similarity_threshold - (1.0 - CONTENT_WEIGHT)) / CONTENT_WEIGHT - _BOUND_SLACK
+
+    # Content similarity per (old line, new line) text pair for this call;
+    # repeated lines (braces, returns, comments) otherwise redo the distance
+    content_scores = {}
+
     # Second pass: Similarity matching for unmatched blocks
     for (i1, i2), (j1, j2) in unmatched_blocks:
         old_range = list(range(i1, i2))
         new_range = list(range(j1, j2))
 
+        # Build, vectorize and norm each line's context once per block rather
+        # than once per candidate pair
+        new_vectors = [vectorize(get_context(new_lines, new_idx, window=context_window)) for new_idx in new_range]
+        new_norms = [vector_norm(vec) for vec in new_vectors]
+
         for old_idx in old_range:
             if old_idx in mapping:
                 continue
@@ -128,16 +189,43 @@ def match_lines(old_lines, new_lines, context_window=4,
             best_score = 0.0
 
             line_a = old_lines[old_idx]
-            ctx_a = get_context(old_lines, old_idx, window=context_window)
+            len_a = len(line_a)
+            vec_a = vectorize(get_context(old_lines, old_idx, window=context_window))
+            norm_a = vector_norm(vec_a)
 
-            for new_idx in new_range:
+            for new_idx, vec_b, norm_b in zip(new_range, new_vectors, new_norms):
                 if new_idx in used_new:
                     continue
 
                 line_b = new_lines[new_idx]
-                ctx_b = get_context(new_lines, new_idx, window=context_window)
+                len_b = len(line_b)
+                if len_a != len_b and min(len_a, len_b) < min_length_ratio * max(len_a, len_b):
+                    continue
+
+                # Context similarity is cheap next to levenshtein, so score it first
+                # and only compute the distance when the pair, with content
+                # similarity at its min_len / max_len bound, could still win
+                context_sim = cosine_from_norms(vec_a, norm_a, vec_b, norm_b)
+                max_len = max(len_a, len_b)
+                content_bound = min(len_a, len_b) / max_len if max_len else 1.0
+                if _weigh(content_bound, context_sim) + _BOUND_SLACK < max(best_score, similarity_threshold):
+                    continue
 
-                score = combined_similarity(line_a, line_b, ctx_a, ctx_b)
+                content_sim = content_scores.get((line_a, line_b))
+                if content_sim is None:
+                    # Every character an alignment keeps is shared by both lines, so
+                    # levenshtein >= max_len - shared characters (as multisets): a
+                    # tighter content bound than the lengths, still far cheaper than
+                    # the distance
+                    bag_a, bag_b = _char_bag(line_a), _char_bag(line_b)
+                    shared = sum(map(min, bag_a.values(), map(bag_b.get, bag_a, repeat(0))))
+                    char_bound = shared / max_len if max_len else 1.0
+                    if _weigh(char_bound, context_sim) + _BOUND_SLACK < max(best_score, similarity_threshold):
+                        continue
+                    content_sim = content_scores[line_a, line_b] = normalized_levenshtein(line_a, line_b)
+
+                # combined_similarity, from the precomputed context vectors
+                score = _weigh(content_sim, context_sim)
 
                 if score > best_score:
                     best_score = score
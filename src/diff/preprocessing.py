@@ -1,7 +1,13 @@
 # preprocessing.py
 # Normalize source code lines before matching
 
+import os
 import re
+from functools import lru_cache
+
+# Bump whenever preprocess_line's output changes; persistent caches of
+# preprocessed lines (FileVersionLoader's cache_dir) are keyed on it
+PREPROCESS_VERSION = 1
 
 
 def preprocess_line(line: str) -> str:
@@ -38,11 +44,20 @@ def preprocess_lines(lines):
     return [preprocess_line(line) for line in lines]
 
 
-def preprocess_file(path: str, encoding: str = "utf-8"):
-    """Load file and return list of preprocessed lines"""
+# Bounded: every edit of a file is a new key, and long runs see many files
+@lru_cache(maxsize=256)
+def _preprocess_file_cached(path: str, mtime_ns: int, size: int, encoding: str):
+    """Preprocess a file once per (path, mtime, size); the stat fields only key the cache"""
     with open(path, "r", encoding=encoding) as f:
         raw_lines = f.readlines()
-    return preprocess_lines(raw_lines)
+    return tuple(preprocess_lines(raw_lines))
+
+
+def preprocess_file(path: str, encoding: str = "utf-8"):
+    """Load file and return list of preprocessed lines"""
+    st = os.stat(path)
+    # Fresh list per call so callers can't mutate the cached copy
+    return list(_preprocess_file_cached(os.path.abspath(path), st.st_mtime_ns, st.st_size, encoding))
 
 
 if __name__ == "__main__":
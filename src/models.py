@@ -6,8 +6,12 @@ Data models for bug backtracking feature
 Contains dataclasses for commits, file versions, bug signatures, and lineage tracking
 """
 
+from collections import Counter
 from dataclasses import dataclass, field
+from functools import cached_property
+from sys import intern
 from typing import List, Dict, Optional, Set, Tuple
+from .diff.matcher import vectorize
 
 
 @dataclass
@@ -38,6 +42,11 @@ class FileVersion:
     # Normalized content for matching
     preprocessed: List[str]
     
+    def __post_init__(self):
+        # Preprocessed lines repeat within and across versions; interning makes
+        # equal lines one object, so diff/dict comparisons short-circuit on identity
+        self.preprocessed = [intern(line) for line in self.preprocessed]
+    
     def __len__(self) -> int:
         return len(self.lines)
     
@@ -80,6 +89,16 @@ class BugSignature:
     def is_empty(self) -> bool:
         """Check if signature has no buggy lines (Possible false positive)"""
         return len(self.buggy_lines) == 0
+    
+    # Context term vectors, built once and reused by every window the
+    # backward search compares against
+    @cached_property
+    def context_before_vector(self) -> Counter:
+        return vectorize(" ".join(self.context_before))
+    
+    @cached_property
+    def context_after_vector(self) -> Counter:
+        return vectorize(" ".join(self.context_after))
 
 
 @dataclass
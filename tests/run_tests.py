@@ -9,13 +9,19 @@ import os
 import traceback
 import re
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 
 # Add parent directory to path for imports
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
 
 # Output file name
 OUTPUT_FILE = "output.txt"
 
+# Below this many cases the process pool startup costs more than it saves
+MIN_PARALLEL_CASES = 4
+
 
 def find_all_test_cases(test_cases_dir):
     """Find all test case pairs in test_cases directory"""
@@ -65,13 +71,11 @@ def run_test_case(old_path, new_path):
         from src.diff.preprocessing import preprocess_file
         from src.diff.diff_hybrid import get_diff_hybrid
         
-        old_lines = preprocess_file(old_path)
-        new_lines = preprocess_file(new_path)
-        
-        old = [[line] for line in old_lines]
-        new = [[line] for line in new_lines]
+        # Interned lines let the diff's string comparisons hit the identity fast path
+        old_lines = [sys.intern(line) for line in preprocess_file(old_path)]
+        new_lines = [sys.intern(line) for line in preprocess_file(new_path)]
         
-        result = get_diff_hybrid(old, new)
+        result = get_diff_hybrid(old_lines, new_lines)
         
         # Verify we got a valid diff result
         assert len(result) > 0, "Should have diff result"
@@ -86,6 +90,12 @@ def run_test_case(old_path, new_path):
         return None
 
 
+def _process_case(case):
+    """Pool worker: run one (case_num, old_path, new_path, ext) case and return (case_num, result)"""
+    case_num, old_path, new_path, _ = case
+    return case_num, run_test_case(old_path, new_path)
+
+
 def main():
     """Run tests using test case files"""
     try:
@@ -124,12 +134,17 @@ def main():
         output_lines.append("")
         output_lines.append("")
         
-        #Run all test cases
-        for case_num in sorted(test_cases.keys()):
-            old_path, new_path, ext = test_cases[case_num]
-            print(f"Testing case {case_num} ({ext})...", end=" ")
-            
-            result = run_test_case(old_path, new_path)
+        #Run all test cases (each case is independent, so fan out across cores)
+        cases = [(case_num,) + test_cases[case_num] for case_num in sorted(test_cases.keys())]
+        if len(cases) < MIN_PARALLEL_CASES:
+            case_results = [_process_case(case) for case in cases]
+        else:
+            with ProcessPoolExecutor() as executor:
+                case_results = list(executor.map(_process_case, cases))
+        
+        # Results come back in case order, so output stays deterministic
+        for (case_num, result), case in zip(case_results, cases):
+            print(f"Testing case {case_num} ({case[3]})...", end=" ")
             
             if result is not None:
                 results[case_num] = result
@@ -146,7 +161,7 @@ def main():
         # Write to output.txt
         output_path = os.path.join(os.path.dirname(__file__), '..', OUTPUT_FILE)
         output_path = os.path.abspath(output_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
             f.write('\n'.join(output_lines))
         
         print("\n" + "=" * 60)
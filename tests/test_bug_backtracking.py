@@ -1,8 +1,12 @@
 """Tests for the bug backtracking feature"""
 
+import io
+import json
 import unittest
 import os
 import sys
+import tempfile
+from contextlib import redirect_stdout
 
 # Add the project root to sys.path so tests can import the src package when run directly
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,6 +15,7 @@ from src.models import CommitInfo, FileVersion, BugSignature, BugLineage, LineMa
 from src.bug_tracking.commit_history import CommitHistory
 from src.bug_tracking.file_version_loader import FileVersionLoader
 from src.bug_tracking.bug_signature import extract_bug_signature, build_line_mapping
+from src.bug_tracking.line_tracker import find_bug_introduction
 from src.bug_tracking.bug_backtracker import BugBacktracker, backtrack_bug_to_origin
 
 # Paths to the synthetic test data used to exercise the bug backtracking logic
@@ -55,6 +60,58 @@ class TestFileVersionLoader(unittest.TestCase):
         versions = loader.get_available_versions()
         
         self.assertEqual(versions, [1, 2, 3])
+    
+    def test_load_version_range(self):
+        """load_version_range should return the existing versions in the range, in order"""
+        loader = FileVersionLoader(TEST_DATA_DIR, "code")
+        versions = loader.load_version_range(0, 5)
+        
+        self.assertEqual([v.version for v in versions], [1, 2, 3])
+        self.assertIs(versions[1], loader.load_version(2))
+        
+        # Concurrent loads into a cache smaller than the range
+        bounded = FileVersionLoader(TEST_DATA_DIR, "list_manager", cache_max=1)
+        versions = bounded.load_version_range(0, 5, max_workers=4)
+        self.assertEqual([v.version for v in versions], [1, 2, 3, 4])
+        self.assertEqual(bounded.cache_stats()['size'], 1)
+    
+    def test_disk_cache(self):
+        """A loader with cache_dir should serve a fresh loader the same version from its disk cache"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = FileVersionLoader(TEST_DATA_DIR, "code", cache_dir=cache_dir).load_version(2)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            
+            second = FileVersionLoader(TEST_DATA_DIR, "code", cache_dir=cache_dir).load_version(2)
+            self.assertEqual(second, first)
+    
+    def test_disk_cache_version_mismatch(self):
+        """Disk cache entries from another preprocessing version should be ignored"""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            expected = FileVersionLoader(TEST_DATA_DIR, "code", cache_dir=cache_dir).load_version(2)
+            entry_path = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+            with open(entry_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            entry['preprocess_version'] -= 1
+            entry['preprocessed'] = ['stale'] * len(entry['preprocessed'])
+            with open(entry_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            
+            reloaded = FileVersionLoader(TEST_DATA_DIR, "code", cache_dir=cache_dir).load_version(2)
+            self.assertEqual(reloaded.preprocessed, expected.preprocessed)
+    
+    def test_cache_max(self):
+        """A bounded loader should evict the least recently used version and count hits and misses"""
+        loader = FileVersionLoader(TEST_DATA_DIR, "code", cache_max=2)
+        first = loader.load_version(1)
+        loader.load_version(2)
+        self.assertIs(loader.load_version(1), first)
+        loader.load_version(3)
+        
+        self.assertIs(loader.load_version(1), first)
+        self.assertEqual(loader.cache_stats(), {'hits': 2, 'misses': 3, 'size': 2, 'max': 2})
+        # Version 2 was the least recently used, so it was evicted
+        loader.load_version(2)
+        self.assertEqual(loader.cache_stats()['misses'], 4)
 
 
 class TestBugSignature(unittest.TestCase):
@@ -83,6 +140,25 @@ class TestLineMapping(unittest.TestCase):
         self.assertEqual(mapping.exact_matches[0], 0)
         self.assertEqual(mapping.exact_matches[2], 2)
         self.assertEqual(mapping.similarity_matches[1], 1)
+    
+    def test_get_new_line(self):
+        """get_new_line should reverse both match kinds and reflect later changes to the matches"""
+        mapping = build_line_mapping(['1:1', '2-', '3~2', '3+'], 0, 1)
+        
+        self.assertEqual(mapping.get_new_line(1), 1)
+        self.assertEqual(mapping.get_new_line(3), 2)
+        self.assertIsNone(mapping.get_new_line(2))
+        
+        mapping.exact_matches[4] = 4
+        self.assertEqual(mapping.get_new_line(4), 4)
+        
+        # Re-pointing matches leaves the dict sizes unchanged
+        swapped = build_line_mapping(['1:1', '2:2'], 0, 1)
+        self.assertEqual(swapped.get_new_line(1), 1)
+        swapped.exact_matches[1] = 2
+        swapped.exact_matches[2] = 1
+        self.assertEqual(swapped.get_new_line(1), 2)
+        self.assertEqual(swapped.get_new_line(2), 1)
 
 
 class TestBugBacktracker(unittest.TestCase):
@@ -99,6 +175,19 @@ class TestBugBacktracker(unittest.TestCase):
         self.assertEqual(lineage.fix_version, 3)
         self.assertTrue(lineage.fix_commit.is_bug_fix)
     
+    def test_analyze_file_output(self):
+        """analyze_file should print its report only when verbose"""
+        backtracker = BugBacktracker(DESC_FILE, TEST_DATA_DIR)
+        quiet, loud = io.StringIO(), io.StringIO()
+        with redirect_stdout(quiet):
+            backtracker.analyze_file("code", verbose=False)
+        with redirect_stdout(loud):
+            backtracker.analyze_file("code")
+        
+        self.assertEqual(quiet.getvalue(), "")
+        self.assertIn("ANALYZING FILE: code", loud.getvalue())
+        self.assertIn("BUG TRACE RESULTS", loud.getvalue())
+    
     def test_trace_bug(self):
         backtracker = BugBacktracker(DESC_FILE, TEST_DATA_DIR)
         lineage = backtracker.trace_single_bug("code", bug_fix_version=3)
@@ -199,6 +288,16 @@ class TestListManagerBug(unittest.TestCase):
         self.assertFalse(signature.is_empty())
         # Should detect change in bounds check line
         self.assertGreater(len(signature.buggy_lines), 0)
+    
+    def test_list_manager_parallel_introduction(self):
+        """Searching versions on a process pool should find the same introduction and matches"""
+        loader = FileVersionLoader(TEST_DATA_DIR, "list_manager")
+        signature = extract_bug_signature(loader.load_version(3), loader.load_version(4))
+        versions = [loader.load_version(v) for v in (3, 2, 1)]
+        
+        serial = find_bug_introduction(versions, signature, 0.6)
+        parallel = find_bug_introduction(versions, signature, 0.6, max_workers=2)
+        self.assertEqual(parallel, serial)
 
 
 def run_tests():
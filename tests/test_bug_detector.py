@@ -111,6 +111,28 @@ class TestBugDetector(unittest.TestCase):
 
         #Note: keyword-based detector will match "bug" in "bug tracking"
         # More sophisticated detection would need context understanding
+    
+    def test_keyword_inside_word(self):
+        """Test that keywords only count at the start of a word"""
+        self.assertTrue(self.detector.is_bug_fix("fixed typos in readme"))
+        self.assertTrue(self.detector.is_bug_fix("handle crashes on startup"))
+        self.assertFalse(self.detector.is_bug_fix("add prefix to log lines"))
+        self.assertFalse(self.detector.is_bug_fix("add debug output"))
+    
+    def test_non_fix_conventional_types(self):
+        """Test that non-fix conventional commit types are rejected outright"""
+        self.assertFalse(self.detector.is_bug_fix("docs: fix typo in readme"))
+        self.assertFalse(self.detector.is_bug_fix("Test(parser): cover error paths"))
+        self.assertTrue(self.detector.is_bug_fix("perf: fix slow query"))
+    
+    def test_custom_keywords_and_prefixes(self):
+        """Test that keywords and prefixes passed to the constructor replace the defaults"""
+        detector = BugDetector(fix_keywords=["Oops"], conventional_prefixes=["docs:"])
+        self.assertTrue(detector.is_bug_fix("oops, wrong index"))
+        self.assertFalse(detector.is_bug_fix("fix crash on login"))
+        self.assertTrue(detector.is_bug_fix("docs: update readme"))
+        self.assertTrue(detector.is_bug_fix("closes #12"))
+        self.assertFalse(BugDetector(fix_keywords=[]).is_bug_fix("add new feature"))
 
 
 class TestParseCommitMessages(unittest.TestCase):
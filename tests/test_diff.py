@@ -0,0 +1,172 @@
+"""Test suite for the myers and hybrid diffs"""
+
+import sys
+import os
+import unittest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from src.diff.diff import get_diff
+from src.diff import diff_hybrid
+from src.diff.diff_hybrid import get_diff_hybrid, get_diff_with_hash, _unique_anchors, _common_prefix_len
+
+
+class TestMyersEditBudget(unittest.TestCase):
+    """Test the optional max_d edit budget of get_diff"""
+    
+    def test_default_is_exact(self):
+        """Without max_d, heavily edited inputs still get the exact myers diff"""
+        old = [f"old {i}" for i in range(100)] + ["shared"]
+        new = [f"new {i}" for i in range(100)] + ["shared"]
+        
+        diff = get_diff(old, new)
+        self.assertIn("101:101", diff)
+        self.assertEqual(diff, get_diff(old, new, max_d=len(old) + len(new)))
+    
+    def test_small_example(self):
+        """A small diff keeps its matches, deletions and insertions in order"""
+        diff = get_diff(["a", "b", "c", "d"], ["a", "c", "d", "e"])
+        self.assertEqual(diff, ["1:1", "2-", "3:2", "4:3", "4+"])
+    
+    def test_budget_exceeded_falls_back(self):
+        """Past max_d edits every old line is deleted and every new line inserted"""
+        old = ["a", "b", "c"]
+        new = ["x", "b", "y"]
+        
+        self.assertEqual(get_diff(old, new, max_d=3), ["1-", "2-", "3-", "1+", "2+", "3+"])
+        self.assertEqual(get_diff(old, new, max_d=4), get_diff(old, new))
+    
+    def test_hybrid_has_no_budget(self):
+        """The hybrid diff keeps exact matches in heavily edited files"""
+        # The repeated closing braces can't be anchors, so myers has to find them
+        old = [f"old line number {i}" for i in range(100)] + ["}", "}"]
+        new = [f"completely different {i * 7}" for i in range(100)] + ["}", "}"]
+        
+        diff = get_diff_hybrid(old, new)
+        self.assertIn("101:101", diff)
+        self.assertIn("102:102", diff)
+
+
+class TestUniqueAnchors(unittest.TestCase):
+    """Test the unique-line anchors get_diff_hybrid matches before running myers"""
+    
+    def test_moved_unique_line(self):
+        """A moved unique line falls outside the anchors and is paired by similarity"""
+        old = ["int a = 1", "int b = 2", "int c = 3", "return a"]
+        new = ["int b = 2", "int c = 3", "return a", "int a = 1"]
+        
+        self.assertEqual(_unique_anchors(old, new), [(1, 0), (2, 1), (3, 2)])
+        self.assertEqual(get_diff_hybrid(old, new), ["1~4", "2:1", "3:2", "4:3"])
+    
+    def test_moved_block(self):
+        """Of two swapped blocks, the anchors keep one and similarity pairs the other"""
+        old = ["def f():", "return 1", "def g():", "return 2"]
+        new = ["def g():", "return 2", "def f():", "return 1"]
+        
+        self.assertEqual(get_diff_hybrid(old, new, use_similarity=False),
+                         ["1-", "2-", "3:1", "4:2", "3+", "4+"])
+        self.assertEqual(get_diff_hybrid(old, new), ["1~3", "2~4", "3:1", "4:2"])
+    
+    def test_duplicate_lines_left_to_myers(self):
+        """Repeated lines are never anchors; myers matches them between the anchors"""
+        old = ["int a = 1", "}", "int b = 2", "}"]
+        new = ["int a = 1", "}", "int c = 3", "}"]
+        
+        self.assertEqual(_unique_anchors(old, new), [(0, 0)])
+        self.assertEqual(get_diff_hybrid(old, new, use_similarity=False),
+                         ["1:1", "2:2", "3-", "4:4", "3+"])
+    
+    def test_anchor_differs_from_myers(self):
+        """An anchored unique line wins over the duplicate plain myers would match"""
+        old = ["import os", "}"]
+        new = ["}", "}", "import os"]
+        
+        self.assertEqual(get_diff(old, new), ["1-", "2:1", "2+", "3+"])
+        self.assertEqual(get_diff_hybrid(old, new, use_similarity=False), ["1:3", "2-", "1+", "2+"])
+        self.assertEqual(get_diff_hybrid(old, new), ["1:3", "2~1", "2+"])
+
+
+class TestCommonPrefix(unittest.TestCase):
+    """Test the shared-prefix shortcut get_diff_hybrid takes before anchoring"""
+    
+    def test_common_prefix_len(self):
+        """_common_prefix_len counts leading equal lines, up to the shorter file"""
+        self.assertEqual(_common_prefix_len(["a", "b", "c"], ["a", "b", "d"]), 2)
+        self.assertEqual(_common_prefix_len(["a", "b"], ["a", "b", "c"]), 2)
+        self.assertEqual(_common_prefix_len(["a"], ["b"]), 0)
+        self.assertEqual(_common_prefix_len([], ["a"]), 0)
+    
+    def test_prefix_duplicates_matched_in_place(self):
+        """Repeated lines in the shared prefix are matched position by position"""
+        old = ["}", "}", "int a = 1"]
+        new = ["}", "}", "int b = 2"]
+        
+        self.assertEqual(get_diff_hybrid(old, new, use_similarity=False), ["1:1", "2:2", "3-", "3+"])
+    
+    def test_uniqueness_counts_the_prefix(self):
+        """A line that also occurs in the prefix is not an anchor after it"""
+        old = ["import os", "x = 1", "y = 2", "import os"]
+        new = ["import os", "x = 1", "z = 3", "import os"]
+        
+        self.assertEqual(_common_prefix_len(old, new), 2)
+        self.assertEqual(_unique_anchors(old, new, 2), [])
+        self.assertEqual(get_diff_hybrid(old, new, use_similarity=False),
+                         ["1:1", "2:2", "3-", "4:4", "3+"])
+
+
+class TestDiffWithHash(unittest.TestCase):
+    """Test get_diff_with_hash and its bounded result cache"""
+    
+    def test_repeated_call(self):
+        """A repeated call returns an equal result that callers can mutate safely"""
+        old = ["line1", "line2", "line3"]
+        new = ["line1", "modified_line2", "line3", "line4"]
+        
+        first = get_diff_with_hash(old, new)
+        self.assertEqual(first["diff"], get_diff_hybrid(old, new))
+        first["diff"].append("5+")
+        self.assertEqual(get_diff_with_hash(old, new)["diff"], get_diff_hybrid(old, new))
+    
+    def test_line_boundaries_in_key(self):
+        """Inputs with the same text split into different lines are cached apart"""
+        self.assertEqual(get_diff_with_hash(["a\nb"], ["a", "b"])["diff"], ["1-", "1+", "2+"])
+        self.assertEqual(get_diff_with_hash(["a", "b"], ["a", "b"])["diff"], ["1:1", "2:2"])
+    
+    def test_cache_is_bounded(self):
+        """Only the most recent results are kept"""
+        for i in range(diff_hybrid._DIFF_HASH_CACHE_MAX + 10):
+            get_diff_with_hash([f"line {i}"], [])
+        self.assertLessEqual(len(diff_hybrid._diff_hash_cache), diff_hybrid._DIFF_HASH_CACHE_MAX)
+
+
+def run_all_tests():
+    """Run all diff tests"""
+    print("=" * 60)
+    print("Running Diff Tests")
+    print("=" * 60)
+    
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    
+    suite.addTests(loader.loadTestsFromTestCase(TestMyersEditBudget))
+    suite.addTests(loader.loadTestsFromTestCase(TestUniqueAnchors))
+    suite.addTests(loader.loadTestsFromTestCase(TestCommonPrefix))
+    suite.addTests(loader.loadTestsFromTestCase(TestDiffWithHash))
+    
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    print("=" * 60)
+    if result.wasSuccessful():
+        print("All diff tests passed")
+        print("=" * 60)
+        return True
+    else:
+        print("Some tests failed")
+        print("=" * 60)
+        return False
+
+
+if __name__ == "__main__":
+    run_all_tests()